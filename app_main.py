@@ -1,9 +1,23 @@
 import streamlit as st
-from PIL import Image
-import io
+import os
 import time
-from google import genai
-client = genai.Client(api_key='GeminiAPI')
+import uuid
+from functools import partial
+from brief_context import brief_hash, build_request, create_brief_context, is_context_current, release_brief_context
+from brief_schema import (
+    BRIEF_FIELDS, campaign_inputs, render_brief, render_section, section_signature, stale_sections
+)
+from campaign_store import CampaignStore
+from chat_memory import build_chat_instruction, build_summary_prompt, count_tokens, plan_history
+from demo_content import DEMO_BRIEF, DEMO_CAMPAIGN_GOAL, DEMO_CONTENT
+from demo_pack import open_demo_pack
+from gemini_clients import ClientPool
+from generation import call_model, create_runtime
+from image_pipeline import prepare_image
+from jobs import DONE, FAILED, RUNNING, JobManager
+from prefetch import PrefetchPlanner
+from session_store import SessionStore
+from prompts import BRAND_ARCHETYPES, CONTENT_TYPES, JOURNEY_STAGES, POSITIONING_STRATEGIES
 
 # Page configuration
 st.set_page_config(
@@ -12,11 +26,35 @@ st.set_page_config(
     layout="wide"
 )
 
+GENERATION_WORKERS = 8
+SESSION_STORE_PATH = ".cache/sessions.sqlite3"
+BRIEF_INDEX_PATH = ".cache/briefs.sqlite3"
+CAMPAIGN_STORE_PATH = ".cache/campaigns.sqlite3"
+# Chat turns kept in session state; older ones spill to the session store
+MAX_MESSAGES_IN_MEMORY = 40
+CHAT_PAGE_SIZE = 20
+STORE_TOUCH_INTERVAL_SECONDS = 60
+WARM_UP_CLIENT = True
+# How often panels with running background jobs refresh their progress
+JOB_POLL_SECONDS = 1.0
+# Latency SLO for brief sections: calls fail past the deadline and slow ones get a hedged duplicate
+BRIEF_DEADLINE_SECONDS = 90.0
+# The brief is one job, running the campaign graph's section nodes in parallel
+BRIEF_JOB = "creative_brief"
+# Override the Gemini endpoint, e.g. to run against benchmarks/fake_gemini.py
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
+
 # Initialize session state
 if "messages" not in st.session_state:
     st.session_state.messages = []
 if "creative_brief" not in st.session_state:
     st.session_state.creative_brief = None
+if "brief_sections" not in st.session_state:
+    st.session_state.brief_sections = None
+if "brief_signatures" not in st.session_state:
+    st.session_state.brief_signatures = {}
+if "brief_draft" not in st.session_state:
+    st.session_state.brief_draft = None
 if "campaign_content" not in st.session_state:
     st.session_state.campaign_content = {}
 if "api_key" not in st.session_state:
@@ -25,44 +63,244 @@ if "demo_mode" not in st.session_state:
     st.session_state.demo_mode = False
 if "gemini_configured" not in st.session_state:
     st.session_state.gemini_configured = False
+if "time_to_first_token" not in st.session_state:
+    st.session_state.time_to_first_token = {}
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if "spilled_messages" not in st.session_state:
+    st.session_state.spilled_messages = 0
+if "last_store_touch" not in st.session_state:
+    st.session_state.last_store_touch = 0.0
+if "chat_visible" not in st.session_state:
+    st.session_state.chat_visible = CHAT_PAGE_SIZE
+if "chat_summary" not in st.session_state:
+    st.session_state.chat_summary = ""
+if "chat_summarized_upto" not in st.session_state:
+    st.session_state.chat_summarized_upto = 0
+if "jobs" not in st.session_state:
+    st.session_state.jobs = {}
+if "job_errors" not in st.session_state:
+    st.session_state.job_errors = {}
+if "prefetch_jobs" not in st.session_state:
+    st.session_state.prefetch_jobs = {}
+if "prefetched_brief" not in st.session_state:
+    st.session_state.prefetched_brief = None
+if "demo_combination" not in st.session_state:
+    st.session_state.demo_combination = None
+if "brief_match" not in st.session_state:
+    st.session_state.brief_match = None
+if "user_id" not in st.session_state:
+    # Kept in the page URL, so campaign history survives refreshes and server restarts
+    st.session_state.user_id = st.query_params.get("user") or uuid.uuid4().hex
+if "campaign_id" not in st.session_state:
+    st.session_state.campaign_id = None
+if "campaign_thread" not in st.session_state:
+    # Checkpoint thread of the current brief in the campaign graph
+    st.session_state.campaign_thread = None
+if "history" not in st.session_state:
+    st.session_state.history = None
+
+
+@st.cache_resource
+def get_client_pool():
+    """Process-wide Gemini client pool, warmed for the secrets key when one is configured"""
+    pool = ClientPool(base_url=GEMINI_BASE_URL)
+    try:
+        secrets_api_key = st.secrets.get("api_key")
+    except Exception:
+        secrets_api_key = None
+    if WARM_UP_CLIENT and secrets_api_key:
+        pool.warm_up_in_background(secrets_api_key)
+    return pool
+
+
+@st.cache_resource
+def get_runtime():
+    """Process-wide services for generation code, passed explicitly because it also runs in worker threads"""
+    return create_runtime()
+
+
+@st.cache_resource
+def get_session_store():
+    """Process-wide spill store for chat history beyond MAX_MESSAGES_IN_MEMORY"""
+    return SessionStore(SESSION_STORE_PATH)
+
+
+@st.cache_resource
+def get_prefetch_planner():
+    """Process-wide ranking of the content types users pick, shared so every session learns from all of them"""
+    return PrefetchPlanner(CONTENT_TYPES)
+
+
+@st.cache_resource
+def get_brief_index():
+    """Process-wide similarity index over past briefs, loaded on the first brief request"""
+    # NumPy stays off the first-render path
+    from brief_index import BriefIndex
+
+    return BriefIndex(BRIEF_INDEX_PATH)
+
+
+@st.cache_resource
+def get_campaign_graph():
+    """Process-wide campaign graph that runs every session's brief and content, checkpointed to disk"""
+    # LangGraph stays off the first-render path
+    from campaign_graph import build_campaign_graph, open_checkpointer
+
+    return build_campaign_graph(get_runtime(), open_checkpointer())
+
+
+@st.cache_resource
+def get_campaign_store():
+    """Process-wide store of every user's campaigns"""
+    return CampaignStore(CAMPAIGN_STORE_PATH)
+
+
+@st.cache_resource
+def get_demo_pack():
+    """Process-wide memory-mapped demo pack, opened on first demo view; None when none has been built"""
+    return open_demo_pack()
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def load_uploaded_image(data):
+    """Preprocess an upload once per content hash and reuse it across reruns and sessions"""
+    return prepare_image(data)
+
+
+@st.cache_resource
+def get_job_manager():
+    """Process-wide background job runner, so generation never blocks a script run"""
+    return JobManager(max_workers=GENERATION_WORKERS)
+
+
+def add_message(role, content):
+    """Append a chat message, spilling the oldest ones to disk so session memory stays bounded"""
+    st.session_state.messages.append({"role": role, "content": content})
+    spill_messages()
+
+
+def spill_messages():
+    """Move messages beyond MAX_MESSAGES_IN_MEMORY, oldest first, to the session store"""
+    overflow = len(st.session_state.messages) - MAX_MESSAGES_IN_MEMORY
+    if overflow > 0:
+        get_session_store().append(
+            st.session_state.session_id, st.session_state.spilled_messages, st.session_state.messages[:overflow]
+        )
+        del st.session_state.messages[:overflow]
+        st.session_state.spilled_messages += overflow
+        st.session_state.last_store_touch = time.time()
+
+
+def load_messages(start, end):
+    """Messages at absolute positions start <= position < end, from the session store and session state"""
+    spilled = st.session_state.spilled_messages
+    messages = st.session_state.messages[max(0, start - spilled):max(0, end - spilled)]
+    if start < spilled:
+        messages = get_session_store().load(st.session_state.session_id, start, min(end, spilled)) + messages
+    return messages
+
+
+def show_earlier_messages():
+    st.session_state.chat_visible += CHAT_PAGE_SIZE
+
+
+def campaign_payload():
+    """What restore_campaign needs to bring this session's campaign back
+
+    The chat is kept as its running summary plus every turn not folded into it yet, including
+    spilled ones, so a restored chat answers with the same context. Turns already summarized are
+    only kept in the summary.
+    """
+    summarized = st.session_state.chat_summarized_upto
+    total = st.session_state.spilled_messages + len(st.session_state.messages)
+    start = min(summarized, st.session_state.spilled_messages)
+    return {
+        "creative_brief": st.session_state.creative_brief,
+        "brief_sections": st.session_state.brief_sections,
+        "brief_signatures": st.session_state.brief_signatures,
+        "campaign_content": st.session_state.campaign_content,
+        "chat_summary": st.session_state.chat_summary,
+        "messages": load_messages(start, total),
+        # How many of messages the summary already covers
+        "chat_summarized_upto": summarized - start
+    }
+
+
+def save_campaign(inputs=None):
+    """Save this session's campaign; with inputs, a new brief starts a new campaign in the history"""
+    store = get_campaign_store()
+    if inputs is not None:
+        st.session_state.campaign_id = store.create(st.session_state.user_id, inputs, campaign_payload())
+        # Reloaded from the first page next time, so the new campaign shows at the top
+        st.session_state.history = None
+    elif st.session_state.campaign_id is not None:
+        store.update(st.session_state.user_id, st.session_state.campaign_id, campaign_payload())
+
+
+def restore_campaign(campaign_id):
+    """Replace this session's campaign with a saved one's brief, content and chat; False if it is gone"""
+    payload = get_campaign_store().load(st.session_state.user_id, campaign_id)
+    if payload is None:
+        return False
+
+    for label in list(st.session_state.jobs):
+        cancel_job(label)
+    discard_prefetch()
+    st.session_state.brief_draft = None
+    st.session_state.brief_match = None
+    st.session_state.job_errors = {}
+    st.session_state.time_to_first_token = {}
+    st.session_state.campaign_id = campaign_id
+    st.session_state.campaign_thread = None
+    st.session_state.creative_brief = payload["creative_brief"]
+    st.session_state.brief_sections = payload["brief_sections"]
+    st.session_state.brief_signatures = payload["brief_signatures"]
+    st.session_state.campaign_content = payload["campaign_content"]
+    # The restored turns start a fresh chat window; spills overwrite this session's old ones
+    st.session_state.messages = payload["messages"]
+    st.session_state.spilled_messages = 0
+    st.session_state.chat_visible = CHAT_PAGE_SIZE
+    st.session_state.chat_summary = payload.get("chat_summary", "")
+    st.session_state.chat_summarized_upto = payload.get("chat_summarized_upto", 0)
+    spill_messages()
+    return True
+
+
+def load_more_history():
+    """Button callback: append the next page of campaign history, continuing from the last one shown"""
+    history = st.session_state.history
+    entries, cursor = get_campaign_store().page(st.session_state.user_id, after=history["cursor"], **history["filters"])
+    history["entries"] += entries
+    history["cursor"] = cursor
+
+
+def demo_text(kind, combination):
+    """Precomputed demo text for an (archetype, positioning, stage) combination
+
+    Falls back to the built-in samples when there is no demo pack or it lacks the combination.
+    """
+    pack = get_demo_pack()
+    text = pack.get(*combination, kind) if pack is not None and combination else None
+    if text is None:
+        return DEMO_BRIEF if kind == "brief" else DEMO_CONTENT[kind]
+    return text
+
+
+def show_demo(combination):
+    """Show the demo brief for combination; content demos follow it"""
+    st.session_state.demo_mode = True
+    st.session_state.demo_combination = combination
+    st.session_state.creative_brief = demo_text("brief", combination)
+    st.session_state.brief_sections = None
+    st.session_state.brief_signatures = {}
+    st.session_state.campaign_thread = None
 
-# Brand archetypes dictionary
-BRAND_ARCHETYPES = {
-    "hero": "Courageous, inspiring, overcoming challenges",
-    "rebel": "Disruptive, revolutionary, anti-establishment", 
-    "sage": "Wisdom, truth, expertise, knowledge-sharing",
-    "innocent": "Simple, optimistic, nostalgic, pure",
-    "explorer": "Adventure, freedom, discovery, independence",
-    "magician": "Transformation, vision, making dreams real",
-    "everyman": "Relatable, authentic, humble, inclusive",
-    "lover": "Intimacy, passion, sensory pleasure, connection",
-    "jester": "Playful, humorous, entertaining, irreverent",
-    "caregiver": "Compassionate, nurturing, protective, supportive",
-    "creator": "Innovation, imagination, self-expression",
-    "ruler": "Power, control, exclusivity, leadership"
-}
-
-# Positioning strategies
-POSITIONING_STRATEGIES = {
-    "market-leader": "Confident, authoritative, setting industry standards",
-    "challenger": "Disruptive, comparative, highlighting competitor weaknesses",
-    "niche-specialist": "Expert, focused, deep domain knowledge",
-    "value-innovator": "Game-changing benefits, unique value proposition",
-    "customer-champion": "Empathetic, user-focused, community-driven"
-}
-
-# Customer journey stages
-JOURNEY_STAGES = {
-    "awareness": "Top-of-funnel: Educational content, problem awareness",
-    "consideration": "Middle-of-funnel: Comparison, feature-benefit analysis", 
-    "conversion": "Bottom-of-funnel: Urgency, clear CTAs, purchase-focused",
-    "retention": "Post-purchase: Loyalty, community, ongoing value",
-    "advocacy": "Advocacy: Social proof, testimonials, referrals"
-}
 
 def configure_gemini(api_key):
     try:
-        client = genai.Client(api_key=api_key)
+        # Borrow the process-wide client for this key rather than building one per session
+        client = get_client_pool().get(api_key)
         st.session_state.gemini_client = client
         st.session_state.gemini_configured = True
         return True
@@ -72,167 +310,595 @@ def configure_gemini(api_key):
         return False
 
 
-def generate_creative_brief(image, campaign_goal, brand_archetype, positioning, journey_stage, additional_context=""):
-    """Generate creative brief using Gemini"""
-    
-    try:
-        client = st.session_state.gemini_client  # Must use configured client
-        
-        # Construct the prompt
-        prompt = f"""
-        As a senior marketing strategist, generate a comprehensive creative brief.
-
-        CAMPAIGN CONTEXT:
-        - Primary Goal: {campaign_goal}
-        - Brand Archetype: {brand_archetype} - {BRAND_ARCHETYPES[brand_archetype]}
-        - Market Positioning: {positioning} - {POSITIONING_STRATEGIES[positioning]}
-        - Target Journey Stage: {journey_stage} - {JOURNEY_STAGES[journey_stage]}
-        - Additional Context: {additional_context}
-
-        Please provide a structured creative brief with these sections:
-
-        1. TARGET AUDIENCE PERSONA
-        2. BRAND POSITIONING & MESSAGING
-        3. CREATIVE DIRECTION
-
-        Keep the brief professional yet actionable.
-        """
-
-        # If you have an image, you can send it as part of multimodal content (optional)
-        if image:
-            # For the new SDK, images can be passed as bytes in a multimodal call
-            img_bytes = io.BytesIO()
-            image.save(img_bytes, format="PNG")
-            img_bytes = img_bytes.getvalue()
-
-            response = client.models.generate_content(
-                model="gemini-2.5-multimodal-preview",
-                content=[prompt, img_bytes]
-            )
+def queue_status(status):
+    """on_wait callback that shows the caller's place in the shared rate-limit queue"""
+    def on_wait(position, seconds):
+        if position == 1 and seconds > 0:
+            status.info(f"⏳ High demand: you're next, starting in about {seconds:.0f}s")
         else:
-            response = client.models.generate_content(
-                model="gemini-2.5-flash",
-                content=prompt
-            )
+            status.info(f"⏳ High demand: you're #{position} in the queue")
+    return on_wait
 
-        return response.text
 
-    except Exception as e:
-        st.error(f"Error generating creative brief: {str(e)}")
+def submit_job(label, fn, *args, stream=False, **kwargs):
+    """Run fn(client, runtime, *args, **kwargs) in the background as this session's job for label
+
+    Replaces any earlier job for label.
+    """
+    cancel_job(label)
+    st.session_state.job_errors.pop(label, None)
+    st.session_state.jobs[label] = get_job_manager().submit(
+        label, fn, st.session_state.gemini_client, get_runtime(), *args, stream=stream, **kwargs
+    )
+
+
+def cancel_job(label):
+    job_id = st.session_state.jobs.pop(label, None)
+    if job_id is not None:
+        get_job_manager().cancel(job_id)
+        get_job_manager().discard(job_id)
+
+
+def active_job(label):
+    """This session's unfinished job for label, or None"""
+    job_id = st.session_state.jobs.get(label)
+    return get_job_manager().get(job_id) if job_id else None
+
+
+def collect_jobs():
+    """Move finished jobs' results into session state; returns True when any job finished"""
+    manager = get_job_manager()
+    collected = False
+    content_done = False
+    for label, job_id in list(st.session_state.jobs.items()):
+        job = manager.get(job_id)
+        if job is not None and not job.finished:
+            continue
+
+        del st.session_state.jobs[label]
+        manager.discard(job_id)
+        collected = True
+        if job is None:
+            # Expired, or the server restarted since it was submitted
+            continue
+
+        if job.status == DONE and label == BRIEF_JOB:
+            state = job.result
+            first_token = state.get("first_token", {})
+            # Sections kept from the previous brief have no first token
+            ttfts = [first_token[field] for field in BRIEF_FIELDS if first_token.get(field) is not None]
+            st.session_state.brief_draft["sections"] = state["sections"]
+            st.session_state.brief_draft["first_token"] = min(ttfts) if ttfts else None
+        elif job.status == DONE:
+            text, ttft = job.result
+            if ttft is None:
+                st.session_state.time_to_first_token.pop(label, None)
+            else:
+                st.session_state.time_to_first_token[label] = ttft
+            st.session_state.campaign_content[label] = text
+            content_done = True
+        elif job.status == FAILED and label == BRIEF_JOB:
+            st.session_state.job_errors["creative_brief"] = f"Error generating creative brief: {job.error}"
+        elif job.status == FAILED:
+            st.session_state.job_errors[label] = f"Error generating {label.replace('_', ' ')}: {job.error}"
+
+    finish_brief()
+    if content_done:
+        save_campaign()
+    return collected
+
+
+def finish_brief():
+    """Swap in the drafted brief once its job is done; an incomplete draft is dropped"""
+    draft = st.session_state.brief_draft
+    if draft is None or BRIEF_JOB in st.session_state.jobs:
+        return
+
+    st.session_state.brief_draft = None
+    if set(draft["sections"]) != set(BRIEF_FIELDS):
+        # A section failed or was cancelled; the previous brief stays, and the graph resumes from
+        # the finished sections if the same brief is requested again
+        return
+
+    st.session_state.brief_sections = draft["sections"]
+    st.session_state.brief_signatures = draft["signatures"]
+    st.session_state.creative_brief = render_brief(draft["sections"])
+    st.session_state.campaign_thread = draft["thread"]
+    if draft.get("first_token") is not None:
+        st.session_state.time_to_first_token["creative_brief"] = draft["first_token"]
+    else:
+        st.session_state.time_to_first_token.pop("creative_brief", None)
+    add_message("assistant", draft["announcement"])
+    save_campaign(draft["inputs"])
+
+    try:
+        get_brief_index().add(st.session_state.user_id, draft["inputs"], draft["sections"])
+    except Exception:
+        # Reuse is an optimization; a brief that isn't indexed just won't be offered again
+        pass
+
+
+def cancel_brief():
+    cancel_job(BRIEF_JOB)
+
+
+def brief_job(client, runtime, graph, thread_id, inputs, image, sections, seed, stream, on_chunk, on_wait=None):
+    """Job: run the campaign graph up to the brief and return its state
+
+    Reports {field: (text so far, finished)} for the sections written so far through on_chunk,
+    streaming each one's text when stream is set.
+    """
+    from campaign_graph import run_brief
+
+    progress = {}
+
+    def report(finished, field, text):
+        progress[field] = (text, finished)
+        on_chunk(dict(progress))
+
+    return run_brief(
+        graph, thread_id, client, inputs, sections, seed, image=image,
+        on_chunk=partial(report, False) if stream else None, on_done=partial(report, True), on_wait=on_wait,
+        deadline=BRIEF_DEADLINE_SECONDS
+    )
+
+
+def content_job(client, runtime, graph, thread_id, content_type, on_chunk=None, on_wait=None, background=None):
+    """Job: generate one content type through the campaign graph; returns its text and time to first token"""
+    from campaign_graph import run_content
+
+    state = run_content(
+        graph, thread_id, client, [content_type], on_chunk=(lambda node, text: on_chunk(text)) if on_chunk else None,
+        on_wait=on_wait, background=background
+    )
+    return state["content"][content_type], state.get("first_token", {}).get(content_type)
+
+
+def current_campaign_thread():
+    """Checkpoint thread of the current brief, starting one for a brief the graph didn't generate"""
+    from campaign_graph import adopt_brief
+
+    brief = st.session_state.creative_brief
+    thread_id = st.session_state.campaign_thread or f"{st.session_state.user_id}:{brief_hash(brief)[:16]}"
+    # Also restores a thread the checkpointer deleted as idle while this session kept its brief
+    adopt_brief(get_campaign_graph(), thread_id, brief, st.session_state.brief_sections)
+    st.session_state.campaign_thread = thread_id
+    return thread_id
+
+
+def poll_while_running(panel, *args):
+    """Run panel as a fragment that refreshes every JOB_POLL_SECONDS while this session has jobs running"""
+    run_every = JOB_POLL_SECONDS if st.session_state.jobs else None
+    st.fragment(panel, run_every=run_every)(*args)
+
+
+def show_job_progress(label, message, stream_responses, cancellable=True, text=None):
+    """Render a running job's partial output or queue position, with a button to cancel it
+
+    text, when given, is shown instead of the job's partial output, e.g. one section of the brief job's.
+    """
+    job = active_job(label)
+    text = job.partial if text is None else text
+    queued = job.queue_status()
+    if queued is not None:
+        queue_status(st.empty())(*queued)
+    elif stream_responses and text:
+        st.markdown(text + "▌")
+    else:
+        st.info(f"⏳ {message} ({time.time() - job.created_at:.0f}s)")
+    if cancellable:
+        st.button("✖ Cancel", key=f"cancel_{label}", on_click=cancel_job, args=(label,))
+
+
+def start_creative_brief(image, campaign_goal, brand_archetype, positioning, journey_stage, additional_context="", stream=False,
+                         seed=None, offer_similar=True):
+    """Start generating the creative brief sections whose inputs changed, as one background job
+
+    Sections whose inputs are unchanged are kept from the current brief. image is a payload from
+    load_uploaded_image, or None. With offer_similar, a past brief for a near-duplicate campaign is
+    offered instead (see brief_match) when there is one; seed holds the sections of such a brief
+    to adapt rather than write from scratch.
+    """
+    inputs = campaign_inputs(campaign_goal, brand_archetype, positioning, journey_stage, additional_context, image)
+    announcement = (
+        f"Here's your creative brief based on **{brand_archetype}** archetype and **{positioning}** positioning:"
+    )
+    stale = stale_sections(inputs, st.session_state.brief_signatures)
+    if not stale:
+        add_message("assistant", announcement)
+        return
+    if offer_similar:
+        st.session_state.brief_match = find_similar_brief(inputs)
+        if st.session_state.brief_match is not None:
+            return
+
+    from campaign_graph import campaign_thread
+
+    # Content prefetched for the old brief is no use any more
+    discard_prefetch()
+    current = st.session_state.brief_sections or {}
+    kept = {field: current[field] for field in BRIEF_FIELDS if field not in stale}
+    thread_id = campaign_thread(st.session_state.user_id, inputs, seed)
+    st.session_state.brief_draft = {
+        "sections": kept,
+        "signatures": {field: section_signature(field, inputs) for field in BRIEF_FIELDS},
+        "inputs": inputs,
+        "announcement": announcement,
+        "thread": thread_id
+    }
+    # If you have an image, it is sent as its preprocessed, downscaled payload.
+    # Always given on_chunk, which also reports each section as it finishes
+    submit_job(
+        BRIEF_JOB, brief_job, get_campaign_graph(), thread_id, inputs, image, kept, seed, stream, stream=True
+    )
+
+
+def find_similar_brief(inputs):
+    """The user's most similar past brief for inputs above the reuse threshold, or None"""
+    try:
+        # Only the user's own briefs: another user's campaign goal and brief are never shown
+        return get_brief_index().best_match(st.session_state.user_id, inputs)
+    except Exception:
         return None
 
 
-def generate_campaign_content(brief, content_type):
-    """Generate campaign content based on the creative brief"""
-    
+def reuse_brief(match, inputs):
+    """Adopt a similar campaign's brief as this one's, without any model call"""
+    discard_prefetch()
+    st.session_state.brief_sections = match["sections"]
+    st.session_state.brief_signatures = {field: section_signature(field, inputs) for field in BRIEF_FIELDS}
+    st.session_state.creative_brief = render_brief(match["sections"])
+    st.session_state.campaign_thread = None
+    st.session_state.time_to_first_token.pop("creative_brief", None)
+    add_message(
+        "assistant",
+        f"♻️ Here's the brief from a similar campaign ({match['score']:.0%} match): *{match['campaign_goal']}*"
+    )
+    save_campaign(inputs)
+
+
+def show_brief_offer(match):
+    """Offer a near-duplicate campaign's brief as it is, as a seed to adapt, or to generate a new one anyway"""
+    st.info(
+        f"♻️ A brief for a similar campaign already exists ({match['score']:.0%} match):\n\n"
+        f"*{match['campaign_goal']}*"
+    )
+    col_reuse, col_adapt, col_new = st.columns(3)
+    col_reuse.button("Use it", on_click=choose_brief, args=("reuse",), use_container_width=True,
+                     help="Show that brief right away, at no API cost")
+    col_adapt.button("Adapt it", on_click=choose_brief, args=("adapt",), use_container_width=True,
+                     help="Rewrite that brief for this campaign with the cheapest model")
+    col_new.button("Generate new", on_click=choose_brief, args=("new",), use_container_width=True)
+
+
+def choose_brief(choice):
+    """Offer button callback: "reuse", "adapt" or "new" for the similar brief on offer"""
+    st.session_state.brief_choice = choice
+
+
+def request_brief():
+    """Button callback: ask for a brief unless this session already has one in flight"""
+    if st.session_state.campaign_goal and st.session_state.brief_draft is None:
+        st.session_state.brief_requested = True
+
+
+def get_brief_context(brief):
+    """Return this session's registered context for brief, re-registering it when the brief changes or expires"""
+    client = st.session_state.gemini_client
+    context = st.session_state.get("brief_context")
+    model = get_runtime().router.context_model()
+
+    if not is_context_current(context, brief, model):
+        release_brief_context(client, context)
+        context = create_brief_context(client, model, brief)
+        st.session_state.brief_context = context
+
+    return context
+
+
+def start_prefetch(brief, stream=False):
+    """Speculatively generate the content types users most often pick next, at background priority"""
+    discard_prefetch()
+    st.session_state.prefetched_brief = brief_hash(brief)
+
+    planner = get_prefetch_planner()
+    # Content already shown may be from an earlier brief, so only skip types being generated right now
+    content_types = planner.choose(exclude=set(st.session_state.jobs))
+    if not content_types:
+        return
     try:
-        client = st.session_state.gemini_client
-        
-        content_prompts = {
-            "social_media": f"Based on this creative brief, create 5 engaging social media posts:\n{brief}",
-            "email_copy": f"Based on this creative brief, write 2 email variations:\n{brief}",
-            "ad_copy": f"Based on this creative brief, create 3 ad variations for digital platforms:\n{brief}"
-        }
-        
-        prompt = content_prompts.get(content_type, content_prompts["social_media"])
+        thread_id = current_campaign_thread()
+    except Exception:
+        # Purely speculative; a real request will surface the error
+        return
 
-        response = client.models.generate_content(
-            model="gemini-2.5-flash",
-            content=prompt
+    graph = get_campaign_graph()
+    for content_type in content_types:
+        st.session_state.prefetch_jobs[content_type] = get_job_manager().submit(
+            content_type, content_job, st.session_state.gemini_client, get_runtime(), graph, thread_id, content_type,
+            stream=stream, background=True
         )
+    planner.record_started(len(content_types))
+
+
+def discard_prefetch():
+    """Cancel this session's unused prefetches, e.g. because the brief changed"""
+    manager = get_job_manager()
+    for job_id in st.session_state.prefetch_jobs.values():
+        manager.cancel(job_id)
+        manager.discard(job_id)
+    get_prefetch_planner().record_discarded(len(st.session_state.prefetch_jobs))
+    st.session_state.prefetch_jobs = {}
+    st.session_state.prefetched_brief = None
+
+
+def claim_prefetch(content_type):
+    """Adopt a running or finished prefetch as this session's job for content_type; True if there was one"""
+    job_id = st.session_state.prefetch_jobs.pop(content_type, None)
+    if job_id is None:
+        return False
+
+    manager = get_job_manager()
+    planner = get_prefetch_planner()
+    job = manager.get(job_id)
+    if job is None or job.status not in (RUNNING, DONE):
+        # Still waiting for a background worker, or failed: a fresh foreground job is faster
+        manager.cancel(job_id)
+        manager.discard(job_id)
+        planner.record_discarded(1)
+        return False
+
+    manager.promote(job_id)
+    st.session_state.jobs[content_type] = job_id
+    planner.record_used()
+    return True
+
+
+def start_campaign_content(content_types, stream=False):
+    """Start generating each content type in the background through the campaign graph, from the current brief
 
-        return response.text
+    Content types already prefetched for this brief are adopted instead of generated again.
+    """
+    content_types = [content_type for content_type in content_types if not claim_prefetch(content_type)]
+    if not content_types:
+        return
 
+    try:
+        thread_id = current_campaign_thread()
     except Exception as e:
-        st.error(f"Error generating {content_type}: {str(e)}")
-        return None
+        st.error(f"Error preparing the brief for content generation: {str(e)}")
+        return
 
-        
+    for content_type in content_types:
+        submit_job(content_type, content_job, get_campaign_graph(), thread_id, content_type, stream=stream)
 
-# Demo content
-DEMO_BRIEF = """
-# 🎯 Creative Brief: Eco-Friendly Coffee Launch
 
-## 1. TARGET AUDIENCE PERSONA
-**Primary Audience:** Millennials & Gen Z (25-40 years old)
-- **Demographics:** Urban professionals, college-educated, $60K+ annual income
-- **Psychographics:** Value sustainability, health-conscious, tech-savvy, experience-driven
-- **Behaviors:** Active on social media, research purchases online, prefer authentic brands
+# Page panels. Each is a fragment, so interacting with one re-executes only that panel
+# instead of rebuilding the sidebar, inputs and every other panel from the top.
+# Panels with running jobs also re-execute on a timer to show progress.
+def brief_panel(stream_responses):
+    """Show the creative brief, or its progress while it is being generated"""
+    if collect_jobs():
+        # A finished job changes the other panels too
+        st.rerun()
 
-## 2. BRAND POSITIONING & MESSAGING
-**Key Messaging Pillars:**
-1. **Sustainable innovation** that doesn't compromise quality
-2. **Empowering customers** to make conscious choices  
-3. **Building community** around shared values
+    if "creative_brief" in st.session_state.job_errors:
+        st.error(st.session_state.job_errors.pop("creative_brief"))
 
-**Brand Voice:** Authentic, Inspiring, Knowledgeable
-**Unique Selling Proposition:** Premium organic coffee with carbon-neutral supply chain
+    draft = st.session_state.brief_draft
+    if draft is not None:
+        # Sections stream into place as they are written; unchanged ones are shown right away
+        with st.expander("🎯 Strategic Creative Brief", expanded=True):
+            job = active_job(BRIEF_JOB)
+            progress = (job.partial if job is not None else None) or {}
+            for field in BRIEF_FIELDS:
+                text, finished = progress.get(field, ("", False))
+                if field in draft["sections"] or finished:
+                    st.markdown(render_section(field, draft["sections"].get(field, text)))
+                elif job is not None:
+                    st.markdown(render_section(field, ""))
+                    show_job_progress(
+                        BRIEF_JOB, "Writing this section...", stream_responses, cancellable=False, text=text
+                    )
+            st.button("✖ Cancel", key="cancel_creative_brief", on_click=cancel_brief)
+    elif st.session_state.creative_brief:
+        with st.expander("🎯 Strategic Creative Brief", expanded=True):
+            st.markdown(st.session_state.creative_brief)
+            ttft = st.session_state.time_to_first_token.get("creative_brief")
+            if ttft is not None:
+                st.caption(f"⚡ First token in {ttft:.2f}s")
 
-## 3. CREATIVE DIRECTION
-**Visual Style:** Clean, natural aesthetics with bold accent colors
-**Content Themes:** Sustainability stories, user-generated content, educational content
-**Call-to-Action Strategy:** Focus on community building and trial offers
 
----
+def content_panel(stream_responses, prefetch):
+    """Content generation controls, progress of running content jobs and previously generated content"""
+    if collect_jobs():
+        st.rerun()
 
-*Note: This is a demo brief. Enter your Gemini API key to generate personalized AI-powered creative briefs.*
-"""
+    brief = st.session_state.creative_brief
+    # While a new brief is being written, the shown one is about to be replaced, so isn't prefetched for
+    if (
+        prefetch and st.session_state.gemini_configured and st.session_state.brief_draft is None
+        and st.session_state.prefetched_brief != brief_hash(brief)
+    ):
+        start_prefetch(brief, stream_responses)
 
-DEMO_SOCIAL_MEDIA = """
-## 📱 Social Media Posts
+    st.subheader("🎨 Generate Campaign Content")
+    content_type = st.radio(
+        "Select content type:",
+        CONTENT_TYPES,
+        format_func=lambda x: x.replace('_', ' ').title(),
+        horizontal=True
+    )
+    
+    if st.session_state.gemini_configured:
+        targets = []
+        col2a, col2b = st.columns(2)
+        with col2a:
+            if st.button(f"Generate {content_type.replace('_', ' ').title()}", use_container_width=True):
+                targets = [content_type]
+                get_prefetch_planner().record_pick(content_type)
+        with col2b:
+            if st.button("⚡ Generate All", use_container_width=True):
+                targets = list(CONTENT_TYPES)
+        if targets:
+            start_campaign_content(targets, stream_responses)
+            # Full rerun, so this panel starts polling for progress
+            st.rerun()
+    else:
+        # Show demo content
+        with st.expander(f"📝 Demo {content_type.replace('_', ' ').title()}", expanded=True):
+            st.markdown(demo_text(content_type, st.session_state.demo_combination))
+            st.info("🔑 Enter API key to generate personalized content")
 
-**Post 1: Brand Story**
-🎯 **Visual:** Behind-the-scenes of coffee farming
-💬 **Caption:** "From our sustainable farms to your morning cup - every bean tells a story of positive impact. ☕️🌱 #SustainableCoffee #EcoFriendly"
-🏷️ **Hashtags:** #CoffeeLovers #EcoWarrior #MorningRitual
+    for shown_type in CONTENT_TYPES:
+        running = shown_type in st.session_state.jobs
+        error = st.session_state.job_errors.pop(shown_type, None)
+        if not running and not error and shown_type not in st.session_state.campaign_content:
+            continue
 
-**Post 2: Product Highlight**  
-🎯 **Visual:** Artistic shot of coffee packaging
-💬 **Caption:** "Packaged with purpose, brewed with passion. Our compostable packaging is just the beginning. ♻️"
-🏷️ **Hashtags:** #ZeroWaste #EcoPackaging #GreenLiving
+        with st.expander(f"📝 {shown_type.replace('_', ' ').title()}", expanded=running or error is not None):
+            if error:
+                st.error(error)
+            if running:
+                show_job_progress(shown_type, f"Creating {shown_type.replace('_', ' ')}...", stream_responses)
+            elif shown_type in st.session_state.campaign_content:
+                st.markdown(st.session_state.campaign_content[shown_type])
+                ttft = st.session_state.time_to_first_token.get(shown_type)
+                if ttft is not None:
+                    st.caption(f"⚡ First token in {ttft:.2f}s")
 
-**Post 3: Community Engagement**
-🎯 **Visual:** User-generated content collage
-💬 **Caption:** "How do you take your sustainable brew? Share your morning routine with us! 👇"
-🏷️ **Hashtags:** #CoffeeCommunity #SustainableLiving #ShareYourBrew
-"""
 
-DEMO_EMAIL_COPY = """
-## 📧 Email Campaign
+def build_chat_turn(client, question, on_wait):
+    """Fit the conversation into the chat token budget, folding aged-out turns into the running summary"""
+    total = st.session_state.spilled_messages + len(st.session_state.messages)
+    # The question itself is already the last message
+    turns = load_messages(st.session_state.chat_summarized_upto, total - 1)
+    to_summarize, recent = plan_history(st.session_state.chat_summary, turns, question)
 
-**Variation 1: Welcome Series**
-**Subject:** Start Your Sustainable Coffee Journey ☕️  
-**Preheader:** Discover how your morning brew can make a difference
+    if to_summarize:
+        summary_prompt = build_summary_prompt(st.session_state.chat_summary, to_summarize)
+        model = get_runtime().router.route("chat_summary", count_tokens(summary_prompt))[0]
+        summary, _ = call_model(client, get_runtime(), model, summary_prompt, "chat_summary", on_wait=on_wait)
+        st.session_state.chat_summary = summary
+        st.session_state.chat_summarized_upto += len(to_summarize)
 
-**Body:**
-Welcome to the revolution! We're thrilled to have you join our community of conscious coffee lovers. 
+    return build_chat_instruction(st.session_state.chat_summary, recent, question)
 
-✨ **What makes us different:**
-• Carbon-neutral supply chain
-• Direct trade with farmers
-• 100% compostable packaging
 
-**CTA:** [Explore Our Blends]
+@st.fragment
+def chat_panel():
+    """Chat history and input for follow-up strategy questions"""
+    spilled = st.session_state.spilled_messages
+    total = spilled + len(st.session_state.messages)
+    visible = min(st.session_state.chat_visible, total)
 
----
+    if total > visible:
+        st.button(
+            f"⬆️ Load earlier messages ({total - visible} more)",
+            on_click=show_earlier_messages,
+            use_container_width=True
+        )
 
-**Variation 2: Educational Content**
-**Subject:** The Truth About Sustainable Coffee 🌱
-**Preheader:** 5 things every coffee drinker should know
+    # Only the most recent window is rendered; older pages come from the session store on demand
+    messages = load_messages(total - visible, total)
+    if spilled and time.time() - st.session_state.last_store_touch > STORE_TOUCH_INTERVAL_SECONDS:
+        # Keep this session's spilled history from being evicted as idle
+        get_session_store().touch(st.session_state.session_id)
+        st.session_state.last_store_touch = time.time()
+
+    # Display chat messages
+    for message in messages:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    
+    # Chat input
+    if prompt := st.chat_input("Ask questions about your creative strategy..."):
+        # Add user message to chat history
+        add_message("user", prompt)
+        
+        # Display user message
+        with st.chat_message("user"):
+            st.markdown(prompt)
+        
+        # Generate assistant response
+        with st.chat_message("assistant"):
+            with st.spinner("Thinking..."):
+                try:
+                    client = st.session_state.gemini_client
+                    context = get_brief_context(st.session_state.creative_brief)
+                    status = st.empty()
+                    
+                    chat_instruction = build_chat_turn(client, prompt, queue_status(status))
+                    
+                    model = get_runtime().router.route("chat", count_tokens(context["prefix"] + chat_instruction))[0]
+                    contents, config = build_request(context, chat_instruction, model=model)
+                    reply, _ = call_model(
+                        client, get_runtime(), model, contents, "chat", config,
+                        on_wait=queue_status(status)
+                    )
+                    status.empty()
+                    
+                    st.markdown(reply)
+                    add_message("assistant", reply)
+                    save_campaign()
+                    
+                except Exception as e:
+                    st.error(f"Error in chat: {str(e)}")
 
-**Body:**
-Did you know traditional coffee farming contributes to deforestation? We're changing that, one cup at a time.
 
-📚 **In this email:**
-- The impact of shade-grown coffee
-- How direct trade supports farmers
-- Our sustainability certifications
+@st.fragment
+def history_panel():
+    """This user's past campaigns, newest first, fetched a page at a time and only once opened"""
+    if not st.toggle("🗂️ Campaign history", key="show_history"):
+        return
+
+    filters = {
+        "brand_archetype": st.selectbox(
+            "Archetype", [None] + list(BRAND_ARCHETYPES), format_func=lambda x: x.title() if x else "All",
+            key="history_archetype"
+        ),
+        "positioning": st.selectbox(
+            "Positioning", [None] + list(POSITIONING_STRATEGIES),
+            format_func=lambda x: x.replace('-', ' ').title() if x else "All", key="history_positioning"
+        ),
+        "journey_stage": st.selectbox(
+            "Journey stage", [None] + list(JOURNEY_STAGES), format_func=lambda x: x.title() if x else "All",
+            key="history_stage"
+        )
+    }
+    history = st.session_state.history
+    if history is None or history["filters"] != filters:
+        entries, cursor = get_campaign_store().page(st.session_state.user_id, **filters)
+        history = st.session_state.history = {"filters": filters, "entries": entries, "cursor": cursor}
+
+    if not history["entries"]:
+        st.caption("No saved campaigns yet")
+    for entry in history["entries"]:
+        created = time.strftime("%b %d, %H:%M", time.localtime(entry["created_at"]))
+        goal = entry["campaign_goal"]
+        if st.button(
+            f"{created} · {goal[:40] + '…' if len(goal) > 40 else goal}",
+            key=f"restore_campaign_{entry['id']}",
+            use_container_width=True,
+            help=f"{entry['brand_archetype'].title()} · {entry['positioning'].replace('-', ' ').title()} · "
+                 f"{entry['journey_stage'].title()}",
+            type="primary" if entry["id"] == st.session_state.campaign_id else "secondary"
+        ):
+            if restore_campaign(entry["id"]):
+                # The brief, content and chat panels all change
+                st.rerun()
+            st.error("That campaign is no longer available")
+    if history["cursor"] is not None:
+        st.button("Load more", key="history_more", on_click=load_more_history, use_container_width=True)
 
-**CTA:** [Learn More About Our Mission]
-"""
 
 # Main application
 def main():
+    get_client_pool()
+    collect_jobs()
+    if st.query_params.get("user") != st.session_state.user_id:
+        st.query_params["user"] = st.session_state.user_id
+
     st.title("🎨 Creative Brief Generator Pro")
     st.markdown("Generate strategic marketing briefs and campaign content using AI")
     
@@ -298,6 +964,53 @@ def main():
             index=0  # Default to Awareness
         )
         
+        st.markdown("---")
+        stream_responses = st.checkbox(
+            "⚡ Stream responses",
+            value=True,
+            help="Render briefs and content as they are generated instead of waiting for the full response"
+        )
+        prefetch_content = st.checkbox(
+            "🔮 Prefetch likely content",
+            value=False,
+            help="Start the content types people pick most as soon as a brief is ready, using spare API capacity"
+        )
+
+        cache_stats = get_runtime().cache.stats()
+        st.caption(
+            f"♻️ Response cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits, "
+            f"{cache_stats['misses']} misses, {cache_stats['disk_entries']} stored"
+        )
+        limiter_stats = get_runtime().limiter.stats()
+        flight_stats = get_runtime().flights.stats()
+        st.caption(
+            f"🚦 API queue: {limiter_stats['queued']} waiting, {limiter_stats['in_flight']} in flight "
+            f"(limit {limiter_stats['concurrency_limit']}), {flight_stats['shared']} duplicate requests merged"
+        )
+        hedge_stats = get_runtime().hedger.stats()
+        st.caption(
+            f"⏱️ Hedging: {hedge_stats['hedged']} hedged ({hedge_stats['hedge_wins']} won), "
+            f"{hedge_stats['over_budget']} over budget, {hedge_stats['deadlines_missed']} missed deadline"
+        )
+        router_stats = get_runtime().router.stats()
+        st.caption(
+            "🧭 Models: " + (", ".join(f"{model} ×{count}" for model, count in router_stats["routed"].items()) or "none yet")
+            + f"; {router_stats['escalations']} escalations"
+        )
+        job_stats = get_job_manager().stats()
+        st.caption(f"🧵 Background jobs: {job_stats['active']} running, {job_stats['completed']} completed")
+        if prefetch_content:
+            prefetch_stats = get_prefetch_planner().stats()
+            hit_rate = prefetch_stats["hit_rate"]
+            st.caption(
+                f"🔮 Prefetch: {prefetch_stats['used']} used, {prefetch_stats['discarded']} discarded"
+                + (f" ({hit_rate:.0%} hit rate)" if hit_rate is not None else "")
+            )
+
+        if st.session_state.gemini_configured:
+            st.markdown("---")
+            history_panel()
+
         st.markdown("---")
         st.markdown("### 💡 Tips")
         st.markdown("""
@@ -307,6 +1020,12 @@ def main():
         - No API key? Use demo mode to explore features
         """)
     
+    # A demo follows the sidebar, straight from the demo pack
+    combination = (brand_archetype, positioning, journey_stage)
+    if (not st.session_state.gemini_configured and st.session_state.demo_combination
+            and st.session_state.demo_combination != combination):
+        show_demo(combination)
+
     # Main content area
     col1, col2 = st.columns([1, 1])
     
@@ -322,15 +1041,16 @@ def main():
         
         image = None
         if uploaded_image:
-            image = Image.open(uploaded_image)
-            st.image(image, caption="Uploaded Image", use_column_width=True)
+            image = load_uploaded_image(uploaded_image.getvalue())
+            st.image(image["thumbnail_bytes"], caption="Uploaded Image", use_column_width=True)
         
         # Campaign details
         campaign_goal = st.text_area(
             "Campaign Goal & Context",
             placeholder="Example: Launch new eco-friendly coffee brand to millennials who value sustainability and premium quality...",
             height=100,
-            value="Launch sustainable coffee brand targeting eco-conscious millennials" if not st.session_state.api_key else ""
+            key="campaign_goal",
+            value=DEMO_CAMPAIGN_GOAL if not st.session_state.api_key else ""
         )
         
         additional_context = st.text_area(
@@ -343,35 +1063,43 @@ def main():
         col1a, col1b = st.columns(2)
         
         with col1a:
+            # Submitted before the button renders, so the button shows as locked right away
+            choice = st.session_state.pop("brief_choice", None)
+            match = st.session_state.brief_match
+            if choice and match is not None:
+                st.session_state.brief_match = None
+                if choice == "reuse":
+                    reuse_brief(match, campaign_inputs(
+                        campaign_goal, brand_archetype, positioning, journey_stage, additional_context, image
+                    ))
+                else:
+                    start_creative_brief(
+                        image, campaign_goal, brand_archetype, positioning, journey_stage, additional_context,
+                        stream=stream_responses, seed=match["sections"] if choice == "adapt" else None,
+                        offer_similar=False
+                    )
+            if st.session_state.pop("brief_requested", False) and campaign_goal:
+                start_creative_brief(
+                    image, campaign_goal, brand_archetype, positioning, journey_stage, additional_context,
+                    stream=stream_responses
+                )
             if st.button(
                 "🚀 Generate Creative Brief", 
                 type="primary", 
                 use_container_width=True,
-                disabled=not st.session_state.gemini_configured
-            ):
-                if not campaign_goal:
-                    st.warning("Please enter a campaign goal")
-                else:
-                    with st.spinner("Creating your strategic creative brief..."):
-                        brief = generate_creative_brief(
-                            image, campaign_goal, brand_archetype, 
-                            positioning, journey_stage, additional_context
-                        )
-                        
-                        if brief:
-                            st.session_state.creative_brief = brief
-                            st.session_state.messages.append({
-                                "role": "assistant", 
-                                "content": f"Here's your creative brief based on **{brand_archetype}** archetype and **{positioning}** positioning:"
-                            })
-                            st.rerun()
+                disabled=not st.session_state.gemini_configured or st.session_state.brief_draft is not None,
+                on_click=request_brief
+            ) and not campaign_goal:
+                st.warning("Please enter a campaign goal")
         
         with col1b:
             if not st.session_state.gemini_configured:
                 if st.button("👀 View Demo", use_container_width=True):
-                    st.session_state.demo_mode = True
-                    st.session_state.creative_brief = DEMO_BRIEF
+                    show_demo((brand_archetype, positioning, journey_stage))
                     st.rerun()
+
+        if st.session_state.brief_match is not None:
+            show_brief_offer(st.session_state.brief_match)
         
         # API key message
         if not st.session_state.gemini_configured:
@@ -386,49 +1114,11 @@ def main():
     
     with col2:
         st.subheader("📋 Creative Brief & Content")
-        
-        # Display creative brief
+
+        poll_while_running(brief_panel, stream_responses)
+
         if st.session_state.creative_brief:
-            with st.expander("🎯 Strategic Creative Brief", expanded=True):
-                st.markdown(st.session_state.creative_brief)
-            
-            # Content generation options
-            st.subheader("🎨 Generate Campaign Content")
-            content_type = st.radio(
-                "Select content type:",
-                ["social_media", "email_copy", "ad_copy"],
-                format_func=lambda x: x.replace('_', ' ').title(),
-                horizontal=True
-            )
-            
-            if st.session_state.gemini_configured:
-                if st.button(f"Generate {content_type.replace('_', ' ').title()}", use_container_width=True):
-                    with st.spinner(f"Creating {content_type.replace('_', ' ')}..."):
-                        content = generate_campaign_content(
-                            st.session_state.creative_brief, 
-                            content_type
-                        )
-                        
-                        if content:
-                            st.session_state.campaign_content[content_type] = content
-                            st.rerun()
-            else:
-                # Show demo content
-                demo_content = {
-                    "social_media": DEMO_SOCIAL_MEDIA,
-                    "email_copy": DEMO_EMAIL_COPY,
-                    "ad_copy": "**Demo Ad Copy:** Enter API key to generate personalized ad variations..."
-                }
-                
-                with st.expander(f"📝 Demo {content_type.replace('_', ' ').title()}", expanded=True):
-                    st.markdown(demo_content[content_type])
-                    st.info("🔑 Enter API key to generate personalized content")
-            
-            # Display previously generated content
-            for content_type, content in st.session_state.campaign_content.items():
-                with st.expander(f"📝 {content_type.replace('_', ' ').title()}"):
-                    st.markdown(content)
-        
+            poll_while_running(content_panel, stream_responses, prefetch_content)
         else:
             st.info("👈 Enter campaign details and generate a creative brief to get started")
             
@@ -449,45 +1139,7 @@ def main():
     if st.session_state.gemini_configured and st.session_state.creative_brief:
         st.markdown("---")
         st.subheader("💬 Creative Strategy Chat")
-        
-        # Display chat messages
-        for message in st.session_state.messages:
-            with st.chat_message(message["role"]):
-                st.markdown(message["content"])
-        
-        # Chat input
-        if prompt := st.chat_input("Ask questions about your creative strategy..."):
-            # Add user message to chat history
-            st.session_state.messages.append({"role": "user", "content": prompt})
-            
-            # Display user message
-            with st.chat_message("user"):
-                st.markdown(prompt)
-            
-            # Generate assistant response
-            with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    try:
-                        model = genai.GenerativeModel('gemini-2.5-flash')
-                        
-                        chat_context = f"""
-                        You are a senior marketing strategist. Based on this creative brief, answer the user's question.
-                        
-                        CREATIVE BRIEF:
-                        {st.session_state.creative_brief}
-                        
-                        USER QUESTION: {prompt}
-                        
-                        Provide strategic, actionable advice based on the brief above.
-                        """
-                        
-                        response = model.generate_content(chat_context)
-                        
-                        st.markdown(response.text)
-                        st.session_state.messages.append({"role": "assistant", "content": response.text})
-                        
-                    except Exception as e:
-                        st.error(f"Error in chat: {str(e)}")
+        chat_panel()
 
 if __name__ == "__main__":
-    main()
+    main()
\ No newline at end of file
@@ -0,0 +1,168 @@
+"""Headless batch mode: generate briefs and campaign content for a CSV or JSONL file of campaigns
+
+    python batch.py campaigns.csv --output briefs.jsonl --workers 8
+    python batch.py campaigns.jsonl --output briefs.jsonl --content-types social_media,ad_copy
+
+Each input row needs campaign_goal, brand_archetype, positioning and journey_stage, and may set
+id, additional_context, image_path, content_types (comma separated) and a question for the
+strategy chat. Results are appended to the output JSONL as each campaign finishes; rerunning with
+the same output skips campaigns that already succeeded, so an interrupted run resumes where it
+stopped. Campaigns run through the checkpointed graph in campaign_graph.py, so a failed or
+interrupted campaign also keeps its finished brief sections and content on the next run.
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from brief_schema import campaign_inputs
+from campaign_graph import build_campaign_graph, campaign_thread, load_image, open_checkpointer, run_campaign_graph
+from gemini_clients import ClientPool
+from generation import create_runtime
+from prompts import BRAND_ARCHETYPES, CONTENT_TYPES, JOURNEY_STAGES, POSITIONING_STRATEGIES
+
+REQUIRED_FIELDS = ["campaign_goal", "brand_archetype", "positioning", "journey_stage"]
+
+
+def read_campaigns(path):
+    """Read campaign rows from a .csv or .jsonl file"""
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.endswith(".csv"):
+            return list(csv.DictReader(f))
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def campaign_id(campaign):
+    """Explicit id, or a stable hash of the campaign's inputs"""
+    if campaign.get("id"):
+        return str(campaign["id"])
+    inputs = {field: campaign.get(field) or "" for field in REQUIRED_FIELDS + ["additional_context", "image_path", "content_types"]}
+    return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def validate_campaign(campaign):
+    """Return an error message for an unusable row, or None"""
+    missing = [field for field in REQUIRED_FIELDS if not campaign.get(field)]
+    if missing:
+        return f"missing {', '.join(missing)}"
+    for field, options in (("brand_archetype", BRAND_ARCHETYPES), ("positioning", POSITIONING_STRATEGIES),
+                           ("journey_stage", JOURNEY_STAGES)):
+        if campaign[field] not in options:
+            return f"unknown {field} {campaign[field]!r}"
+    return None
+
+
+def content_types_for(campaign, default_types):
+    requested = campaign.get("content_types")
+    if not requested:
+        return default_types
+    if isinstance(requested, str):
+        requested = [content_type.strip() for content_type in requested.split(",")]
+    return [content_type for content_type in requested if content_type in CONTENT_TYPES]
+
+
+def load_completed_ids(output_path):
+    """Ids that already have a successful result in the output file"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted run
+                continue
+            if not result.get("error"):
+                completed.add(result["id"])
+    return completed
+
+
+def run_campaign(client, graph, campaign, default_types):
+    """Generate the brief and requested content for one campaign using the same prompts as the app"""
+    result = {
+        "id": campaign_id(campaign), "campaign": campaign, "brief": None, "brief_sections": None, "content": {},
+        "error": None
+    }
+    start = time.perf_counter()
+
+    error = validate_campaign(campaign)
+    if error:
+        result["error"] = error
+        return result
+
+    try:
+        image = load_image(campaign["image_path"]) if campaign.get("image_path") else None
+        inputs = campaign_inputs(
+            campaign["campaign_goal"], campaign["brand_archetype"], campaign["positioning"],
+            campaign["journey_stage"], campaign.get("additional_context"), image
+        )
+        content_types = content_types_for(campaign, default_types)
+        state = run_campaign_graph(
+            graph, campaign_thread(result["id"], inputs), client, inputs, content_types,
+            campaign.get("question") or None, image=image
+        )
+        result["brief"] = state["brief"]
+        result["brief_sections"] = state["sections"]
+        result["content"] = {content_type: state["content"][content_type] for content_type in content_types}
+        if campaign.get("question"):
+            result["answer"] = state["answer"]
+        result["timings"] = state["timings"]
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(client, runtime, campaigns, output_path, workers, default_types):
+    """Run the campaigns not yet done in output_path, appending each result as it finishes
+
+    Returns the number of campaigns that failed.
+    """
+    completed = load_completed_ids(output_path)
+    pending = [campaign for campaign in campaigns if campaign_id(campaign) not in completed]
+    print(f"{len(campaigns)} campaigns, {len(campaigns) - len(pending)} already done, {len(pending)} to run", file=sys.stderr)
+    failures = 0
+    graph = build_campaign_graph(runtime, open_checkpointer())
+
+    with ThreadPoolExecutor(max_workers=workers) as executor, open(output_path, "a", encoding="utf-8") as out:
+        futures = [executor.submit(run_campaign, client, graph, campaign, default_types) for campaign in pending]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result = future.result()
+            # Only this thread writes, and each line is flushed to disk before it counts as a checkpoint
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            os.fsync(out.fileno())
+
+            failures += bool(result["error"])
+            status = f"error: {result['error']}" if result["error"] else f"ok ({result.get('seconds', 0):.1f}s)"
+            print(f"[{done}/{len(pending)}] {result['id']} {status}", file=sys.stderr)
+
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="Campaigns as .csv or .jsonl")
+    parser.add_argument("--output", required=True, help="Results JSONL; also the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=4, help="Campaigns generated concurrently")
+    parser.add_argument("--content-types", default="", help="Comma-separated content types for rows without their own")
+    parser.add_argument("--api-key", default=os.getenv("GEMINI_API_KEY"), help="Defaults to $GEMINI_API_KEY")
+    args = parser.parse_args()
+
+    if not args.api_key:
+        parser.error("an API key is required via --api-key or GEMINI_API_KEY")
+
+    default_types = [t.strip() for t in args.content_types.split(",") if t.strip() in CONTENT_TYPES]
+    client = ClientPool(base_url=os.getenv("GEMINI_BASE_URL")).get(args.api_key)
+    failures = run_batch(client, create_runtime(), read_campaigns(args.input), args.output, args.workers, default_types)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
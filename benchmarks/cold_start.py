@@ -0,0 +1,87 @@
+"""Measure cold-start cost of app_main.py: app imports plus first render, in fresh interpreters
+
+    python benchmarks/cold_start.py --runs 5 --budget 1.5
+
+Each run starts a new Python process, so nothing is warm in sys.modules. Streamlit's own import
+is reported separately because a real server has already paid it before the first session.
+Exits non-zero when the median first render exceeds --budget, or when a module that should be
+deferred (the Gemini SDK, httpx, PIL) is imported by the first render.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_DIR, "app_main.py")
+DEFERRED_MODULES = ["google.genai", "httpx", "PIL.Image"]
+
+
+def measure_once():
+    """Child-process side: time one cold first render and report which deferred modules got loaded"""
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    framework_seconds = time.perf_counter() - start
+
+    preloaded = {module for module in DEFERRED_MODULES if module in sys.modules}
+
+    start = time.perf_counter()
+    at = AppTest.from_file(APP_PATH, default_timeout=60).run()
+    first_render_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "framework_seconds": framework_seconds,
+        "first_render_seconds": first_render_seconds,
+        "eager_modules": [m for m in DEFERRED_MODULES if m in sys.modules and m not in preloaded],
+        "exception": at.exception[0].message if at.exception else None
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to measure")
+    parser.add_argument("--budget", type=float, default=1.5, help="Maximum median first-render seconds")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        measure_once()
+        return
+
+    results = []
+    # Run from a scratch directory so caches and logs from earlier runs can't warm anything up
+    with tempfile.TemporaryDirectory() as scratch:
+        for _ in range(args.runs):
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child"],
+                cwd=scratch, capture_output=True, text=True, check=True
+            ).stdout
+            results.append(json.loads(output.strip().splitlines()[-1]))
+
+    framework = statistics.median(r["framework_seconds"] for r in results)
+    first_render = statistics.median(r["first_render_seconds"] for r in results)
+    eager = sorted({m for r in results for m in r["eager_modules"]})
+    exceptions = [r["exception"] for r in results if r["exception"]]
+
+    print(f"streamlit import (median): {framework:.3f}s")
+    print(f"app import + first render (median of {args.runs}): {first_render:.3f}s, budget {args.budget:.3f}s")
+
+    failed = False
+    if first_render > args.budget:
+        print("FAIL: first render is over budget")
+        failed = True
+    if eager:
+        print(f"FAIL: first render imported deferred modules: {', '.join(eager)}")
+        failed = True
+    if exceptions:
+        print(f"FAIL: first render raised: {exceptions[0]}")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Local stand-in for the Gemini REST API, for load testing without spending quota
+
+Serves generateContent, streamGenerateContent (SSE), countTokens, models.get and
+cachedContents create/delete with configurable latency, token rate and error injection.
+
+Run it and point the app at it:
+
+    python benchmarks/fake_gemini.py --port 8765 --latency-median 0.8 --error-rate 0.02
+    GEMINI_BASE_URL=http://127.0.0.1:8765 streamlit run app_main.py
+
+Any API key is accepted.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BRIEF_SECTIONS = ["TARGET AUDIENCE PERSONA", "BRAND POSITIONING & MESSAGING", "CREATIVE DIRECTION"]
+WORDS = (
+    "audience brand story sustainable premium community authentic bold message launch "
+    "campaign insight value trust voice visual channel moment journey growth loyal"
+).split()
+ERROR_STATUSES = {
+    429: "RESOURCE_EXHAUSTED",
+    500: "INTERNAL",
+    503: "UNAVAILABLE"
+}
+PATH_PATTERN = re.compile(r"^/[^/]+/(?:models/)?(?P<model>[^:/?]+)(?::(?P<method>\w+))?")
+
+
+class FakeGeminiConfig:
+    """Latency, throughput and failure behaviour of the fake server"""
+
+    def __init__(self, latency_median=0.5, latency_sigma=0.5, tokens_per_second=80.0, response_tokens=400,
+                 chunk_tokens=10, error_rate=0.0, error_status=503, seed=None):
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.response_tokens = response_tokens
+        self.chunk_tokens = chunk_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+
+    def sample_first_token_latency(self):
+        """Log-normal time to first token around latency_median"""
+        with self.lock:
+            return self.latency_median * math.exp(self.random.gauss(0, self.latency_sigma))
+
+    def should_fail(self):
+        with self.lock:
+            return self.random.random() < self.error_rate
+
+    def response_words(self):
+        """Brief-shaped markdown split into roughly one word per token"""
+        with self.lock:
+            per_section = max(1, self.response_tokens // len(BRIEF_SECTIONS))
+            words = []
+            for number, section in enumerate(BRIEF_SECTIONS, start=1):
+                words.extend(["\n\n##", f"{number}.", *section.split(), "\n"])
+                words.extend(self.random.choice(WORDS) for _ in range(per_section))
+            return words
+
+
+def estimate_tokens(payload):
+    return max(1, len(json.dumps(payload)) // 4)
+
+
+def build_response(model, text, prompt_tokens, response_tokens, final=True):
+    response = {
+        "candidates": [{
+            "content": {"role": "model", "parts": [{"text": text}]},
+            "index": 0
+        }],
+        "modelVersion": model
+    }
+    if final:
+        response["candidates"][0]["finishReason"] = "STOP"
+        response["usageMetadata"] = {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": response_tokens,
+            "totalTokenCount": prompt_tokens + response_tokens
+        }
+    return response
+
+
+class FakeGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = FakeGeminiConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        match = PATH_PATTERN.match(self.path)
+        model = match.group("model") if match else "unknown"
+        self._send_json(200, {"name": f"models/{model}", "displayName": model, "inputTokenLimit": 1048576})
+
+    def do_DELETE(self):
+        self._send_json(200, {})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if "/cachedContents" in self.path:
+            self._send_json(200, {
+                "name": f"cachedContents/{uuid.uuid4().hex}",
+                "model": payload.get("model", ""),
+                "usageMetadata": {"totalTokenCount": estimate_tokens(payload)}
+            })
+            return
+
+        match = PATH_PATTERN.match(self.path)
+        if not match:
+            self._send_error(404, "NOT_FOUND", f"Unknown path {self.path}")
+            return
+
+        model, method = match.group("model"), match.group("method")
+        if method == "countTokens":
+            self._send_json(200, {"totalTokens": estimate_tokens(payload)})
+        elif method == "generateContent":
+            self._generate(model, payload, stream=False)
+        elif method == "streamGenerateContent":
+            self._generate(model, payload, stream=True)
+        else:
+            self._send_error(404, "NOT_FOUND", f"Unknown method {method}")
+
+    def _generate(self, model, payload, stream):
+        config = self.config
+        time.sleep(config.sample_first_token_latency())
+
+        if config.should_fail():
+            self._send_error(config.error_status, ERROR_STATUSES.get(config.error_status, "UNKNOWN"), "Injected failure")
+            return
+
+        prompt_tokens = estimate_tokens(payload)
+        words = config.response_words()
+        seconds_per_token = 1.0 / config.tokens_per_second if config.tokens_per_second else 0.0
+
+        if not stream:
+            time.sleep(len(words) * seconds_per_token)
+            self._send_json(200, build_response(model, " ".join(words), prompt_tokens, len(words)))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        for start in range(0, len(words), config.chunk_tokens):
+            chunk_words = words[start:start + config.chunk_tokens]
+            final = start + config.chunk_tokens >= len(words)
+            text = (" " if start else "") + " ".join(chunk_words)
+            event = build_response(model, text, prompt_tokens, len(words), final=final)
+            self.wfile.write(f"data: {json.dumps(event)}\r\n\r\n".encode())
+            self.wfile.flush()
+            time.sleep(len(chunk_words) * seconds_per_token)
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status, status_name, message):
+        self._send_json(status, {"error": {"code": status, "message": message, "status": status_name}})
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    """Start the fake server on a daemon thread; returns the server and its base URL"""
+    handler = type("ConfiguredFakeGeminiHandler", (FakeGeminiHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_config_arguments(parser):
+    parser.add_argument("--latency-median", type=float, default=0.5, help="Median time to first token in seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80.0, help="Output token rate")
+    parser.add_argument("--response-tokens", type=int, default=400, help="Approximate tokens per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of generations that fail")
+    parser.add_argument("--error-status", type=int, default=503, choices=sorted(ERROR_STATUSES), help="HTTP status of injected failures")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible runs")
+
+
+def config_from_arguments(args):
+    return FakeGeminiConfig(
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        error_rate=args.error_rate,
+        error_status=args.error_status,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server, base_url = start_server(config_from_arguments(args), args.host, args.port)
+    print(f"Fake Gemini listening on {base_url} (set GEMINI_BASE_URL={base_url})")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Drive simulated sessions through app_main.py's brief -> content -> chat flow against the fake Gemini server
+
+    python benchmarks/load_test.py --sessions 20 --concurrency 5 --latency-median 0.3
+    python benchmarks/load_test.py --sessions 50 --max-p95 2.5 --report bench.json
+
+Each simulated session runs in its own subprocess, since Streamlit's AppTest is not safe to run
+on several threads of one process. Reports per-step latency percentiles (generation steps run
+until their background jobs finish), throughput and resident memory per session, and exits
+non-zero when a session can't complete the flow or the --max-p95 or --max-rss-per-session budgets
+are exceeded.
+"""
+import argparse
+import importlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+APP_PATH = os.path.join(REPO_DIR, "app_main.py")
+sys.path.insert(0, BENCHMARK_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from fake_gemini import add_config_arguments, config_from_arguments, start_server
+
+STEPS = ["load", "api_key", "campaign_goal", "brief", "content", "chat"]
+# Stand-in for the app's polling fragments, which AppTest does not run on a timer
+POLL_INTERVAL = 0.5
+
+
+def current_rss_bytes():
+    """Resident set size of this process, falling back to peak RSS off Linux"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def find_button(at, label):
+    return next(button for button in at.button if button.label == label)
+
+
+def run_until_idle(at, timeout):
+    """Rerun the session until it has no background jobs left"""
+    deadline = time.monotonic() + timeout
+    while at.session_state["jobs"] and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        at.run()
+    return at
+
+
+def run_session(session_id, timeout):
+    """Walk one session through the full flow in this process, timing every rerun
+
+    Returns the step timings, the app errors shown along the way, the harness failure that
+    stopped the flow (or None) and this process's RSS growth over the session.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    errors = []
+
+    def timed(step, action):
+        start = time.perf_counter()
+        at = action()
+        timings[step] = time.perf_counter() - start
+        if at.exception:
+            errors.append(f"{step}: {at.exception[0].message}")
+        return at
+
+    # A real server imports these once per process, not per session, so neither timings nor RSS should count them
+    for module in ("google.genai", "PIL.Image", "campaign_graph"):
+        importlib.import_module(module)
+
+    baseline_rss = current_rss_bytes()
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    steps = [
+        ("load", at.run),
+        ("api_key", lambda: at.text_input[0].input(f"fake-key-{session_id % 4}").run()),
+        # A unique goal per session keeps the response cache from hiding model latency
+        ("campaign_goal", lambda: at.text_area[0].input(f"Launch campaign {session_id} {uuid.uuid4().hex[:8]}").run()),
+        ("brief", lambda: run_until_idle(find_button(at, "🚀 Generate Creative Brief").click().run(), timeout)),
+        ("content", lambda: run_until_idle(find_button(at, "⚡ Generate All").click().run(), timeout)),
+        ("chat", lambda: at.chat_input[0].set_value("How should we adapt this for TikTok?").run())
+    ]
+    failure = None
+    for step, action in steps:
+        try:
+            timed(step, action)
+        except Exception as e:
+            # Later steps depend on this one, so the session stops here
+            failure = f"{step}: {type(e).__name__}: {e}"
+            break
+
+    return {"timings": timings, "errors": errors, "failure": failure, "rss_bytes": current_rss_bytes() - baseline_rss}
+
+
+def run_session_process(session_id, timeout):
+    """Run one session in a fresh interpreter and return run_session's result, recording a crash as its failure"""
+    command = [sys.executable, os.path.abspath(__file__), "--session", str(session_id), "--timeout", str(timeout)]
+    try:
+        finished = subprocess.run(command, capture_output=True, text=True, timeout=timeout * len(STEPS))
+    except subprocess.TimeoutExpired:
+        return {"timings": {}, "errors": [], "failure": "timed out", "rss_bytes": 0}
+
+    lines = finished.stdout.strip().splitlines()
+    if finished.returncode or not lines:
+        stderr = finished.stderr.strip().splitlines()
+        return {
+            "timings": {}, "errors": [], "rss_bytes": 0,
+            "failure": f"exit status {finished.returncode}: {stderr[-1] if stderr else 'no output'}"
+        }
+    return json.loads(lines[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10, help="Number of simulated sessions")
+    parser.add_argument("--concurrency", type=int, default=5, help="Sessions running at once")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-rerun timeout in seconds")
+    parser.add_argument("--max-p95", type=float, default=None, help="Fail when p95 rerun latency exceeds this many seconds")
+    parser.add_argument("--max-rss-per-session", type=float, default=None, help="Fail when RSS growth per session exceeds this many MB")
+    parser.add_argument("--report", default=None, help="Write the full report as JSON to this path")
+    # Internal: run one session in this process and print its result as JSON
+    parser.add_argument("--session", type=int, default=None, help=argparse.SUPPRESS)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.session is not None:
+        print(json.dumps(run_session(args.session, args.timeout)))
+        return
+
+    server, base_url = start_server(config_from_arguments(args))
+    # Inherited by the session subprocesses
+    os.environ["GEMINI_BASE_URL"] = base_url
+
+    all_timings = []
+    all_errors = []
+    failures = []
+    rss = []
+    start = time.perf_counter()
+
+    # The threads only wait on the session subprocesses
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = {
+            executor.submit(run_session_process, session_id, args.timeout): session_id
+            for session_id in range(args.sessions)
+        }
+        for future in as_completed(futures):
+            result = future.result()
+            all_timings.append(result["timings"])
+            all_errors.extend(result["errors"])
+            if result["failure"]:
+                failures.append(f"session {futures[future]}: {result['failure']}")
+            else:
+                rss.append(result["rss_bytes"])
+
+    elapsed = time.perf_counter() - start
+    rss_per_session_mb = max(0, sum(rss) / len(rss)) / (1024 * 1024) if rss else 0.0
+    server.shutdown()
+
+    report = {
+        "sessions": args.sessions,
+        "concurrency": args.concurrency,
+        "elapsed_seconds": elapsed,
+        "sessions_per_second": args.sessions / elapsed,
+        "reruns_per_second": sum(len(t) for t in all_timings) / elapsed,
+        "rss_per_session_mb": rss_per_session_mb,
+        "errors": all_errors,
+        "failed_sessions": failures,
+        "steps": {}
+    }
+    rerun_latencies = []
+    for step in STEPS:
+        values = [t[step] for t in all_timings if step in t]
+        rerun_latencies.extend(values)
+        report["steps"][step] = {f"p{q}": percentile(values, q) for q in (50, 95, 99)}
+    report["rerun_p95"] = percentile(rerun_latencies, 95)
+
+    print(f"{args.sessions} sessions in {elapsed:.2f}s "
+          f"({report['sessions_per_second']:.2f} sessions/s, {report['reruns_per_second']:.2f} reruns/s)")
+    print(f"RSS growth per session: {rss_per_session_mb:.2f} MB")
+    print(f"{'step':<15}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for step, stats in report["steps"].items():
+        print(f"{step:<15}" + "".join(f"{stats[k]:>10.3f}" if stats[k] is not None else f"{'-':>10}" for k in ("p50", "p95", "p99")))
+    if all_errors:
+        print(f"{len(all_errors)} errors, first: {all_errors[0]}")
+    if failures:
+        print(f"{len(failures)} of {args.sessions} sessions failed, first: {failures[0]}")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = bool(failures)
+    if args.max_p95 is not None and report["rerun_p95"] is not None and report["rerun_p95"] > args.max_p95:
+        print(f"FAIL: rerun p95 {report['rerun_p95']:.3f}s exceeds budget {args.max_p95:.3f}s")
+        failed = True
+    if args.max_rss_per_session is not None and rss_per_session_mb > args.max_rss_per_session:
+        print(f"FAIL: {rss_per_session_mb:.2f} MB per session exceeds budget {args.max_rss_per_session:.2f} MB")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Register a creative brief once as reusable context for follow-up content and chat calls
+
+Where the brief is long enough for Gemini explicit context caching, it is uploaded once as
+cached content and follow-up calls reference it by name. Shorter briefs fall back to a
+stable-prefix layout (brief first, instruction last) so implicit prefix caching still applies.
+"""
+import hashlib
+import time
+
+STRATEGIST_INSTRUCTION = "You are a senior marketing strategist. Base every answer on the creative brief provided."
+CACHE_TTL_SECONDS = 3600
+# Renew the cached content this long before it expires so in-flight calls never reference a dead cache
+CACHE_RENEW_MARGIN_SECONDS = 120
+# Explicit caching rejects small contexts; estimated at roughly four characters per token
+MIN_CACHED_TOKENS = 1024
+CHARS_PER_TOKEN = 4
+
+
+def brief_hash(brief):
+    return hashlib.sha256(brief.encode()).hexdigest()
+
+
+def build_brief_prefix(brief):
+    """Stable prompt prefix used when the brief is not held in explicit cached content"""
+    return f"{STRATEGIST_INSTRUCTION}\n\nCREATIVE BRIEF:\n{brief}\n\n"
+
+
+def inline_brief_context(brief, model=None):
+    """Context that sends brief inline as the stable prefix, without explicit cached content"""
+    return {
+        "brief_hash": brief_hash(brief),
+        "model": model,
+        "prefix": build_brief_prefix(brief),
+        "cache_name": None,
+        "expires_at": None
+    }
+
+
+def create_brief_context(client, model, brief):
+    """Register brief for model, using explicit cached content when it is large enough"""
+    context = inline_brief_context(brief, model)
+
+    if len(brief) // CHARS_PER_TOKEN < MIN_CACHED_TOKENS:
+        return context
+
+    from google.genai import types
+
+    try:
+        cached_content = client.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"creative-brief-{context['brief_hash'][:12]}",
+                system_instruction=STRATEGIST_INSTRUCTION,
+                contents=[f"CREATIVE BRIEF:\n{brief}"],
+                ttl=f"{CACHE_TTL_SECONDS}s"
+            )
+        )
+        context["cache_name"] = cached_content.name
+        context["expires_at"] = time.time() + CACHE_TTL_SECONDS
+    except Exception:
+        # Caching is an optimization; the stable prefix still works without it
+        pass
+
+    return context
+
+
+def is_context_current(context, brief, model):
+    """Whether context still matches brief and model and its cached content has not expired"""
+    if context is None or context["brief_hash"] != brief_hash(brief) or context["model"] != model:
+        return False
+    if context["expires_at"] is not None:
+        return time.time() < context["expires_at"] - CACHE_RENEW_MARGIN_SECONDS
+    return True
+
+
+def release_brief_context(client, context):
+    """Delete the cached content behind context, if any"""
+    if context and context["cache_name"]:
+        try:
+            client.caches.delete(name=context["cache_name"])
+        except Exception:
+            # It expires on its own TTL anyway
+            pass
+
+
+def build_request(context, instruction, config=None, model=None):
+    """Return (contents, config) for an instruction that follows the brief in context
+
+    Cached content only serves the model it was created for; for any other model the brief is
+    sent inline as the stable prefix.
+    """
+    if context["cache_name"] and model in (None, context["model"]):
+        from google.genai import types
+
+        if config is None:
+            config = types.GenerateContentConfig(cached_content=context["cache_name"])
+        else:
+            config = config.model_copy(update={"cached_content": context["cache_name"]})
+        return instruction, config
+    return context["prefix"] + instruction, config
@@ -0,0 +1,219 @@
+"""Local near-duplicate search over past briefs, so a reworded campaign goal can reuse an earlier brief
+
+Campaign goal and additional context are embedded as signed, feature-hashed word and character
+n-gram vectors (no model, no network calls) and compared by cosine similarity. Only a user's own
+briefs for the same archetype, positioning, journey stage and image can match, so entries are
+partitioned by those. Every brief stays in SQLite, but only each partition's newest SEARCH_WINDOW briefs are held in
+memory and searched, which bounds every search to one small matrix-vector product however many
+briefs are stored.
+"""
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+
+import numpy as np
+
+DIMENSIONS = 256
+# Newest briefs per partition that are searched; older ones stay stored but are no longer offered
+SEARCH_WINDOW = 5000
+TOP_K = 3
+# Cosine similarity from which a past brief is offered for reuse
+SIMILARITY_THRESHOLD = float(os.getenv("BRIEF_REUSE_THRESHOLD", "0.7"))
+
+PARTITION_INPUTS = ["user_id", "brand_archetype", "positioning", "journey_stage", "image"]
+
+
+def _features(text):
+    """Words, word bigrams and character trigrams of each word, so rewordings and typos still overlap"""
+    words = re.findall(r"\w+", text.lower())
+    features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        padded = f"#{word}#"
+        features.extend(padded[i:i + 3] for i in range(len(padded) - 2))
+    return features
+
+
+def embed(text, dimensions=DIMENSIONS):
+    """Unit-length hashed feature vector for text; the hash sign keeps collisions from inflating similarity"""
+    hashes = np.array([zlib.crc32(feature.encode()) for feature in _features(text)], dtype=np.uint32)
+    if not len(hashes):
+        return np.zeros(dimensions, dtype=np.float32)
+    signs = np.where(hashes & 0x80000000, 1.0, -1.0)
+    vector = np.bincount(hashes % dimensions, weights=signs, minlength=dimensions).astype(np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def query_text(campaign_goal, additional_context):
+    return f"{campaign_goal}\n{additional_context}"
+
+
+def partition_key(user_id, inputs):
+    return (user_id,) + tuple(inputs[name] or "" for name in PARTITION_INPUTS[1:])
+
+
+class _Partition:
+    """Vectors of one partition's newest briefs in a ring buffer, overwriting the oldest when full"""
+
+    def __init__(self, dimensions, capacity):
+        self.capacity = capacity
+        self.vectors = np.zeros((min(capacity, 16), dimensions), dtype=np.float32)
+        self.ids = []
+        self.slots = {}
+        self.next_slot = 0
+
+    def add(self, entry_id, vector):
+        """Make vector searchable as entry_id, in place of entry_id's earlier vector if it is still held"""
+        slot = self.slots.get(entry_id)
+        if slot is None and len(self.ids) < self.capacity:
+            if len(self.ids) == len(self.vectors):
+                grown = np.zeros((min(self.capacity, 2 * len(self.vectors)), self.vectors.shape[1]), dtype=np.float32)
+                grown[:len(self.vectors)] = self.vectors
+                self.vectors = grown
+            slot = len(self.ids)
+            self.ids.append(entry_id)
+        elif slot is None:
+            slot = self.next_slot
+            del self.slots[self.ids[slot]]
+            self.ids[slot] = entry_id
+            self.next_slot = (slot + 1) % self.capacity
+        self.slots[entry_id] = slot
+        self.vectors[slot] = vector
+
+    def search(self, vector, k):
+        """Up to k (score, id) pairs, most similar first"""
+        count = len(self.ids)
+        if not count:
+            return []
+        scores = self.vectors[:count] @ vector
+        top = np.argpartition(-scores, k - 1)[:k] if count > k else np.arange(count)
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), self.ids[i]) for i in top]
+
+
+class BriefIndex:
+    """Past briefs in SQLite, searchable in memory by similarity of their campaign goal and context"""
+
+    def __init__(self, path, dimensions=DIMENSIONS, search_window=SEARCH_WINDOW):
+        self.dimensions = dimensions
+        self.search_window = search_window
+        self.searches = 0
+        self.matches = 0
+        self._partitions = {}
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS briefs ("
+            "id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, brand_archetype TEXT NOT NULL, "
+            "positioning TEXT NOT NULL, journey_stage TEXT NOT NULL, image TEXT NOT NULL, "
+            "campaign_goal TEXT NOT NULL, additional_context TEXT NOT NULL, sections TEXT NOT NULL, "
+            "created_at REAL NOT NULL)"
+        )
+        if "user_id" not in [row[1] for row in self._db.execute("PRAGMA table_info(briefs)")]:
+            # Indexed before reuse was per user: they belong to no one, so are never offered again
+            self._db.execute("ALTER TABLE briefs ADD COLUMN user_id TEXT NOT NULL DEFAULT ''")
+            self._db.execute("DROP INDEX IF EXISTS briefs_inputs")
+            self._db.execute("DROP INDEX IF EXISTS briefs_partition")
+        self._db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS briefs_user_inputs ON briefs "
+            "(user_id, brand_archetype, positioning, journey_stage, image, campaign_goal, additional_context)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS briefs_user_partition ON briefs "
+            "(user_id, brand_archetype, positioning, journey_stage, image, created_at)"
+        )
+        self._db.commit()
+        self._load()
+
+    def _load(self):
+        """Embed each partition's search window; older briefs are left in SQLite unread"""
+        rows = self._db.execute(
+            "SELECT id, user_id, brand_archetype, positioning, journey_stage, image, campaign_goal, additional_context "
+            "FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY user_id, brand_archetype, positioning, journey_stage, "
+            "image ORDER BY created_at DESC) AS age FROM briefs WHERE user_id != '') WHERE age <= ? ORDER BY created_at",
+            (self.search_window,)
+        ).fetchall()
+        for entry_id, *key, campaign_goal, additional_context in rows:
+            vector = embed(query_text(campaign_goal, additional_context), self.dimensions)
+            self._partition(tuple(key)).add(entry_id, vector)
+
+    def _partition(self, key):
+        partition = self._partitions.get(key)
+        if partition is None:
+            partition = self._partitions[key] = _Partition(self.dimensions, self.search_window)
+        return partition
+
+    def add(self, user_id, inputs, sections):
+        """Index a brief user_id generated for inputs (see brief_schema.campaign_inputs); returns its id
+
+        A brief for exactly the same inputs replaces the earlier one. Nothing is ever deleted; a brief
+        only leaves the search window once SEARCH_WINDOW newer ones share its partition.
+        """
+        key = partition_key(user_id, inputs)
+        vector = embed(query_text(inputs["campaign_goal"], inputs["additional_context"]), self.dimensions)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM briefs WHERE user_id = ? AND brand_archetype = ? AND positioning = ? "
+                "AND journey_stage = ? AND image = ? AND campaign_goal = ? AND additional_context = ?",
+                key + (inputs["campaign_goal"], inputs["additional_context"])
+            ).fetchone()
+            if row is not None:
+                entry_id = row[0]
+                self._db.execute(
+                    "UPDATE briefs SET sections = ?, created_at = ? WHERE id = ?",
+                    (json.dumps(sections), time.time(), entry_id)
+                )
+            else:
+                entry_id = self._db.execute(
+                    "INSERT INTO briefs (user_id, brand_archetype, positioning, journey_stage, image, "
+                    "campaign_goal, additional_context, sections, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    key + (inputs["campaign_goal"], inputs["additional_context"], json.dumps(sections), time.time())
+                ).lastrowid
+            self._db.commit()
+            self._partition(key).add(entry_id, vector)
+            return entry_id
+
+    def search(self, user_id, inputs, k=TOP_K):
+        """Up to k (score, id) pairs for user_id's briefs with the same partition inputs, most similar first"""
+        vector = embed(query_text(inputs["campaign_goal"], inputs["additional_context"]), self.dimensions)
+        with self._lock:
+            self.searches += 1
+            partition = self._partitions.get(partition_key(user_id, inputs))
+            return partition.search(vector, k) if partition is not None else []
+
+    def get(self, entry_id):
+        """A stored brief's campaign goal, context and sections, or None"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT campaign_goal, additional_context, sections FROM briefs WHERE id = ?", (entry_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"id": entry_id, "campaign_goal": row[0], "additional_context": row[1], "sections": json.loads(row[2])}
+
+    def best_match(self, user_id, inputs, threshold=SIMILARITY_THRESHOLD):
+        """user_id's most similar past brief scoring at least threshold, with its score, or None"""
+        results = self.search(user_id, inputs, k=1)
+        if not results or results[0][0] < threshold:
+            return None
+        score, entry_id = results[0]
+        match = self.get(entry_id)
+        if match is not None:
+            match["score"] = score
+            with self._lock:
+                self.matches += 1
+        return match
+
+    def stats(self):
+        with self._lock:
+            entries = sum(len(partition.ids) for partition in self._partitions.values())
+            return {"entries": entries, "searches": self.searches, "matches": self.matches}
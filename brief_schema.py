@@ -0,0 +1,57 @@
+"""Structured creative briefs: which sections are out of date, markdown rendering and per-content-type excerpts
+
+A brief is a dict of section text by field, each section generated on its own from the
+campaign inputs listed for it in SECTION_INPUTS. The markdown people see is rendered from it.
+"""
+import hashlib
+import json
+
+from prompts import BRIEF_SECTIONS, CONTENT_FIELDS, SECTION_INPUTS
+
+BRIEF_FIELDS = [field for field, _ in BRIEF_SECTIONS]
+
+
+def campaign_inputs(campaign_goal, brand_archetype, positioning, journey_stage, additional_context="", image=None):
+    """Inputs by name as SECTION_INPUTS lists them; an image payload is reduced to a hash of its bytes"""
+    return {
+        "campaign_goal": campaign_goal,
+        "brand_archetype": brand_archetype,
+        "positioning": positioning,
+        "journey_stage": journey_stage,
+        "additional_context": additional_context or "",
+        "image": hashlib.sha256(image["model_bytes"]).hexdigest() if image else None
+    }
+
+
+def section_label(field):
+    """Call and job label for generating one section; routed and tiered as a creative_brief call"""
+    return f"creative_brief:{field}"
+
+
+def section_signature(field, inputs):
+    """Hash of the inputs a section depends on; it needs regenerating when this changes"""
+    relevant = {name: inputs[name] for name in SECTION_INPUTS[field]}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True).encode()).hexdigest()
+
+
+def stale_sections(inputs, signatures):
+    """Fields whose recorded signature does not match inputs, in brief order"""
+    return [field for field in BRIEF_FIELDS if signatures.get(field) != section_signature(field, inputs)]
+
+
+def render_brief(sections, fields=BRIEF_FIELDS):
+    """Markdown for the given sections, numbered and headed in brief order; missing ones are skipped"""
+    return "\n\n".join(
+        render_section(field, sections[field]) for field in BRIEF_FIELDS if field in fields and sections.get(field)
+    )
+
+
+def render_section(field, text):
+    """Markdown for one section under its numbered heading"""
+    number = BRIEF_FIELDS.index(field) + 1
+    return f"## {number}. {dict(BRIEF_SECTIONS)[field]}\n\n{text.strip()}"
+
+
+def brief_excerpt(sections, content_type):
+    """Markdown of only the brief sections content_type declares in CONTENT_FIELDS"""
+    return render_brief(sections, CONTENT_FIELDS.get(content_type, BRIEF_FIELDS))
@@ -0,0 +1,99 @@
+"""Build the offline demo pack: a brief and all content for every archetype × positioning × journey stage
+
+    GEMINI_API_KEY=... python build_demo_pack.py --version 2026-10 --workers 8
+    python build_demo_pack.py --version 2026-10 --pack-only
+
+Generation goes through batch mode with the app's own prompts, and its results file doubles as a
+checkpoint: rerun the same command to resume an interrupted build. The pack is only written once
+every combination has succeeded. --pack-only rebuilds the pack from the results file without
+calling the API.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+
+from batch import run_batch
+from demo_content import DEMO_CAMPAIGN_GOAL
+from demo_pack import DEMO_PACK_PATH, write_demo_pack
+from gemini_clients import ClientPool
+from generation import create_runtime
+from prompts import BRAND_ARCHETYPES, CONTENT_TYPES, JOURNEY_STAGES, POSITIONING_STRATEGIES
+
+DEMO_KINDS = ["brief"] + CONTENT_TYPES
+RESULTS_PATH = "demo/demo_pack.jsonl"
+
+
+def demo_campaigns(campaign_goal=DEMO_CAMPAIGN_GOAL):
+    """One batch campaign per archetype × positioning × journey stage, asking for every content type"""
+    return [
+        {
+            "id": f"{archetype}/{positioning}/{stage}",
+            "campaign_goal": campaign_goal,
+            "brand_archetype": archetype,
+            "positioning": positioning,
+            "journey_stage": stage,
+            "content_types": ",".join(CONTENT_TYPES)
+        }
+        for archetype, positioning, stage in itertools.product(BRAND_ARCHETYPES, POSITIONING_STRATEGIES, JOURNEY_STAGES)
+    ]
+
+
+def read_texts(results_path):
+    """Texts by (archetype, positioning, stage, kind) from the successful results in a batch results file"""
+    texts = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                # A torn final line from an interrupted run
+                continue
+            if result.get("error"):
+                continue
+            campaign = result["campaign"]
+            key = (campaign["brand_archetype"], campaign["positioning"], campaign["journey_stage"])
+            texts[key + ("brief",)] = result["brief"]
+            for content_type, text in result["content"].items():
+                texts[key + (content_type,)] = text
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--version", required=True, help="Pack version recorded in its header, e.g. a date")
+    parser.add_argument("--output", default=DEMO_PACK_PATH, help="Demo pack file")
+    parser.add_argument("--results", default=RESULTS_PATH, help="Batch results JSONL; also the resume checkpoint")
+    parser.add_argument("--workers", type=int, default=4, help="Combinations generated concurrently")
+    parser.add_argument("--pack-only", action="store_true", help="Only pack existing results, without calling the API")
+    parser.add_argument("--api-key", default=os.getenv("GEMINI_API_KEY"), help="Defaults to $GEMINI_API_KEY")
+    args = parser.parse_args()
+
+    campaigns = demo_campaigns()
+    if not args.pack_only:
+        if not args.api_key:
+            parser.error("an API key is required via --api-key or GEMINI_API_KEY")
+        if os.path.dirname(args.results):
+            os.makedirs(os.path.dirname(args.results), exist_ok=True)
+        client = ClientPool(base_url=os.getenv("GEMINI_BASE_URL")).get(args.api_key)
+        run_batch(client, create_runtime(), campaigns, args.results, args.workers, CONTENT_TYPES)
+
+    texts = read_texts(args.results) if os.path.exists(args.results) else {}
+    missing = [
+        campaign["id"] for campaign in campaigns
+        if any((campaign["brand_archetype"], campaign["positioning"], campaign["journey_stage"], kind) not in texts
+               for kind in DEMO_KINDS)
+    ]
+    if missing:
+        print(f"{len(missing)} of {len(campaigns)} combinations are incomplete (e.g. {missing[0]}); "
+              "rerun to fill them in", file=sys.stderr)
+        sys.exit(1)
+
+    write_demo_pack(args.output, texts, BRAND_ARCHETYPES, POSITIONING_STRATEGIES, JOURNEY_STAGES, DEMO_KINDS,
+                    args.version)
+    print(f"Wrote {len(texts)} texts to {args.output} ({os.path.getsize(args.output) / 1e6:.1f} MB)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
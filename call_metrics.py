@@ -0,0 +1,154 @@
+"""Per-call latency, token and error instrumentation for model calls, written to a rotating JSONL log"""
+import json
+import logging
+import math
+import os
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+METRICS_LOG_PATH = "logs/model_calls.jsonl"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+PERCENTILES = (50, 95, 99)
+
+
+class CallMetrics:
+    """Append one JSON record per model call to a size-rotated log file"""
+
+    def __init__(self, path=METRICS_LOG_PATH, max_bytes=MAX_LOG_BYTES, backup_count=LOG_BACKUP_COUNT):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # A private, non-propagating logger gives us thread-safe writes and rotation for free
+        self._logger = logging.getLogger(f"call_metrics.{os.path.abspath(path)}")
+        self._logger.setLevel(logging.INFO)
+        self._logger.propagate = False
+        if not self._logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger.addHandler(handler)
+
+    def record(self, **fields):
+        fields.setdefault("timestamp", time.time())
+        self._logger.info(json.dumps(fields))
+
+    @contextmanager
+    def track(self, call, model, cache_status="miss"):
+        """Time the enclosed model call; the caller may add fields such as token counts to the yielded record"""
+        record = {
+            "call": call,
+            "model": model,
+            "cache_status": cache_status,
+            "prompt_tokens": None,
+            "response_tokens": None,
+            "cached_tokens": None,
+            "time_to_first_token": None,
+            "error": None
+        }
+        start = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["error"] = type(e).__name__
+            raise
+        finally:
+            record["latency"] = time.perf_counter() - start
+            self.record(**record)
+
+
+def usage_fields(usage_metadata):
+    """Extract token counts from a response's usage metadata"""
+    if usage_metadata is None:
+        return {}
+    return {
+        "prompt_tokens": usage_metadata.prompt_token_count,
+        "response_tokens": usage_metadata.candidates_token_count,
+        "cached_tokens": usage_metadata.cached_content_token_count
+    }
+
+
+def load_records(path=METRICS_LOG_PATH, backup_count=LOG_BACKUP_COUNT):
+    """Read records from the log and its rotated backups, oldest first"""
+    records = []
+    for index in range(backup_count, -1, -1):
+        file_path = f"{path}.{index}" if index else path
+        if not os.path.exists(file_path):
+            continue
+        with open(file_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    # A torn last line while another process is writing
+                    continue
+    return records
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of values, or None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(records):
+    """Aggregate records per call into counts, error and cache rates, latency percentiles and token totals"""
+    summary = {}
+    for record in records:
+        summary.setdefault(record["call"], []).append(record)
+
+    for call, call_records in summary.items():
+        # Cache hits and calls that shared another caller's in-flight request never reached the model
+        live = [r for r in call_records if r["cache_status"] == "miss"]
+        latencies = [r["latency"] for r in live if not r.get("error")]
+        ttfts = [r["time_to_first_token"] for r in live if r.get("time_to_first_token") is not None]
+
+        stats = {
+            "calls": len(call_records),
+            "errors": sum(1 for r in call_records if r.get("error")),
+            "cache_hits": sum(1 for r in call_records if r["cache_status"] == "hit"),
+            "shared": sum(1 for r in call_records if r["cache_status"] == "shared"),
+            "prompt_tokens": sum(r.get("prompt_tokens") or 0 for r in live),
+            "response_tokens": sum(r.get("response_tokens") or 0 for r in live)
+        }
+        for q in PERCENTILES:
+            stats[f"latency_p{q}"] = percentile(latencies, q)
+            stats[f"ttft_p{q}"] = percentile(ttfts, q)
+        summary[call] = stats
+
+    return summary
+
+
+def render_prometheus(records):
+    """Render records as Prometheus text exposition format"""
+    lines = [
+        "# HELP model_calls_total Model calls by call, model, cache status and error class.",
+        "# TYPE model_calls_total counter"
+    ]
+    counts = {}
+    for record in records:
+        key = (record["call"], record["model"], record["cache_status"], record.get("error") or "")
+        counts[key] = counts.get(key, 0) + 1
+    for (call, model, cache_status, error), count in sorted(counts.items()):
+        lines.append(
+            f'model_calls_total{{call="{call}",model="{model}",cache="{cache_status}",error="{error}"}} {count}'
+        )
+
+    summary = summarize(records)
+    for metric, prefix in (("model_call_latency_seconds", "latency"), ("model_call_ttft_seconds", "ttft")):
+        lines.append(f"# TYPE {metric} summary")
+        for call, stats in sorted(summary.items()):
+            for q in PERCENTILES:
+                value = stats[f"{prefix}_p{q}"]
+                if value is not None:
+                    lines.append(f'{metric}{{call="{call}",quantile="{q / 100}"}} {value:.6f}')
+
+    lines.append("# TYPE model_call_tokens_total counter")
+    for call, stats in sorted(summary.items()):
+        lines.append(f'model_call_tokens_total{{call="{call}",direction="prompt"}} {stats["prompt_tokens"]}')
+        lines.append(f'model_call_tokens_total{{call="{call}",direction="response"}} {stats["response_tokens"]}')
+
+    return "\n".join(lines) + "\n"
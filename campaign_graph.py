@@ -0,0 +1,260 @@
+"""Campaign pipeline as a checkpointed LangGraph graph: brief sections → brief → content types and chat
+
+The app and batch mode both run campaigns through this graph. Brief sections run in parallel, then
+each requested content type and the optional chat question run in parallel from the finished
+brief. Every node's result is checkpointed under the campaign's thread, so running a campaign again
+after a crash, failure or cancellation resumes from the last completed nodes instead of
+regenerating them. Threads untouched for THREAD_TTL_SECONDS are deleted from the checkpointer. Each node records its wall time in timings and, when streamed, its time to
+first token in first_token.
+
+The client, image and progress callbacks are given per run rather than built into the graph, so
+one compiled graph serves every session.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from functools import lru_cache, partial
+from typing import Annotated, TypedDict
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, StateGraph
+
+from brief_context import inline_brief_context
+from brief_schema import BRIEF_FIELDS, brief_excerpt, render_brief
+from chat_memory import build_chat_instruction
+from generation import generate_routed, generate_section
+from image_pipeline import prepare_image
+from prompts import CONTENT_TYPES, build_content_prompt
+
+CHECKPOINT_PATH = ".cache/campaign_graph.sqlite3"
+THREAD_TTL_SECONDS = 7 * 24 * 3600
+EVICTION_INTERVAL_SECONDS = 300
+
+
+def _merge(left, right):
+    return {**left, **right}
+
+
+class CampaignState(TypedDict, total=False):
+    inputs: dict
+    # Sections of a similar campaign's brief to adapt rather than write from scratch
+    seed: dict
+    content_types: list
+    question: str
+    # Written by parallel nodes, so merged rather than replaced
+    sections: Annotated[dict, _merge]
+    content: Annotated[dict, _merge]
+    timings: Annotated[dict, _merge]
+    first_token: Annotated[dict, _merge]
+    brief: str
+    answer: str
+    answered: str
+
+
+@lru_cache(maxsize=8)
+def load_image(image_path):
+    """Preprocessed image payload for image_path, shared by the sections that use it"""
+    with open(image_path, "rb") as f:
+        return prepare_image(f.read())
+
+
+def _timed(name, fn):
+    def node(state, config):
+        start = time.perf_counter()
+        update = fn(state, config["configurable"])
+        if update:
+            update["timings"] = {name: round(time.perf_counter() - start, 3)}
+        return update
+    return node
+
+
+def _on_chunk(run, node):
+    """on_chunk for one node's model call, or None so it isn't streamed"""
+    return partial(run["on_chunk"], node) if run.get("on_chunk") else None
+
+
+def _done(run, node, text):
+    if run.get("on_done"):
+        run["on_done"](node, text)
+
+
+def build_campaign_graph(runtime, checkpointer):
+    """Compile the campaign graph; run it with run_brief and run_content, or run_campaign_graph"""
+
+    def section_node(field):
+        def generate(state, run):
+            if field in state.get("sections", {}):
+                # Kept from the previous brief, whose inputs for this section are unchanged
+                return {}
+            seed = state.get("seed") or {}
+            text, ttft, _ = generate_section(
+                run["client"], runtime, field, state["inputs"], run.get("image"), _on_chunk(run, field),
+                run.get("on_wait"), run.get("background"), run.get("deadline"), seed.get(field)
+            )
+            _done(run, field, text)
+            return {"sections": {field: text}, "first_token": {field: ttft}}
+        return generate
+
+    def brief_node(state, run):
+        return {"brief": render_brief(state["sections"])}
+
+    def content_node(content_type):
+        def generate(state, run):
+            # Each content type is sent only the brief sections it uses; a brief without sections is sent whole
+            brief = brief_excerpt(state["sections"], content_type) if state.get("sections") else state["brief"]
+            text, ttft, _ = generate_routed(
+                run["client"], runtime, build_content_prompt(content_type), content_type,
+                on_chunk=_on_chunk(run, content_type), context=inline_brief_context(brief),
+                on_wait=run.get("on_wait"), background=run.get("background")
+            )
+            _done(run, content_type, text)
+            return {"content": {content_type: text}, "first_token": {content_type: ttft}}
+        return generate
+
+    def chat_node(state, run):
+        answer, _, _ = generate_routed(
+            run["client"], runtime, build_chat_instruction("", [], state["question"]), "chat",
+            context=inline_brief_context(state["brief"]), on_wait=run.get("on_wait"), background=run.get("background")
+        )
+        _done(run, "chat", answer)
+        return {"answer": answer, "answered": state["question"]}
+
+    def after_brief(state):
+        targets = [content_type for content_type in state.get("content_types") or [] if content_type in CONTENT_TYPES]
+        if state.get("question"):
+            targets.append("chat")
+        return targets or [END]
+
+    graph = StateGraph(CampaignState)
+    for field in BRIEF_FIELDS:
+        graph.add_node(field, _timed(field, section_node(field)))
+        graph.add_edge(START, field)
+    graph.add_node("brief", _timed("brief", brief_node))
+    # Waits for every section
+    graph.add_edge(BRIEF_FIELDS, "brief")
+    for content_type in CONTENT_TYPES:
+        graph.add_node(content_type, _timed(content_type, content_node(content_type)))
+        graph.add_edge(content_type, END)
+    graph.add_node("chat", _timed("chat", chat_node))
+    graph.add_edge("chat", END)
+    graph.add_conditional_edges("brief", after_brief, CONTENT_TYPES + ["chat", END])
+    return graph.compile(checkpointer=checkpointer)
+
+
+class CampaignCheckpointer(SqliteSaver):
+    """SqliteSaver that deletes the checkpoints and writes of threads idle longer than the TTL"""
+
+    def __init__(self, conn, ttl_seconds=THREAD_TTL_SECONDS):
+        super().__init__(conn)
+        self.ttl_seconds = ttl_seconds
+        self._last_eviction = 0.0
+        with self.cursor() as cur:
+            cur.execute("CREATE TABLE IF NOT EXISTS threads (thread_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)")
+            cur.execute("CREATE INDEX IF NOT EXISTS threads_last_seen ON threads (last_seen)")
+            # Threads checkpointed before their use was tracked get a full TTL from now
+            cur.execute(
+                "INSERT OR IGNORE INTO threads (thread_id, last_seen) SELECT DISTINCT thread_id, ? FROM checkpoints",
+                (time.time(),)
+            )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        result = super().put(config, checkpoint, metadata, new_versions)
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, last_seen) VALUES (?, ?)",
+                (str(config["configurable"]["thread_id"]), time.time())
+            )
+        if time.time() - self._last_eviction > EVICTION_INTERVAL_SECONDS:
+            self.evict_idle()
+        return result
+
+    def evict_idle(self):
+        """Delete checkpoints and writes of threads with no new checkpoint for longer than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        with self.cursor() as cur:
+            for table in ("checkpoints", "writes"):
+                cur.execute(
+                    f"DELETE FROM {table} WHERE thread_id IN (SELECT thread_id FROM threads WHERE last_seen < ?)",
+                    (cutoff,)
+                )
+            cur.execute("DELETE FROM threads WHERE last_seen < ?", (cutoff,))
+        self._last_eviction = time.time()
+
+
+def open_checkpointer(path=CHECKPOINT_PATH, ttl_seconds=THREAD_TTL_SECONDS):
+    """SQLite checkpointer shared by every thread of a process"""
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    return CampaignCheckpointer(sqlite3.connect(path, check_same_thread=False), ttl_seconds)
+
+
+def campaign_thread(campaign_id, inputs, seed=None):
+    """Checkpoint thread id for campaign_id's brief from inputs, adapted from seed if given
+
+    Changed inputs make a new thread rather than mixing with results for the old ones.
+    """
+    key = inputs if seed is None else [inputs, seed]
+    digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:16]
+    return f"{campaign_id}:{digest}"
+
+
+def _config(thread_id, client, run):
+    return {"configurable": {"thread_id": thread_id, "client": client, **run}}
+
+
+def run_brief(graph, thread_id, client, inputs, sections=None, seed=None, **run):
+    """Generate a campaign's brief and return the thread's state once the brief is done
+
+    inputs come from brief_schema.campaign_inputs; sections already written for them are kept
+    rather than generated again. run holds per-run options for the nodes: image (a prepare_image
+    payload), on_chunk(node, text) to stream each node's text so far, on_done(node, text) as each
+    node finishes, on_wait and background as for generate_text, and deadline for the sections.
+    A thread that stopped partway continues from its last checkpoint, and one with a brief
+    already returns it without any model call.
+    """
+    config = _config(thread_id, client, run)
+    snapshot = graph.get_state(config)
+    if snapshot.values.get("brief") is not None:
+        return snapshot.values
+    if snapshot.next:
+        return graph.invoke(None, config)
+    return graph.invoke(
+        {"inputs": inputs, "seed": seed, "sections": sections or {}, "content_types": [], "question": None}, config
+    )
+
+
+def adopt_brief(graph, thread_id, brief, sections=None):
+    """Start thread_id from a brief that wasn't generated by the graph, e.g. one restored or reused
+
+    Without sections, content is generated from the whole brief.
+    """
+    config = {"configurable": {"thread_id": thread_id}}
+    if graph.get_state(config).values.get("brief") is None:
+        graph.update_state(config, {"sections": sections or {}, "brief": brief}, as_node="brief")
+
+
+def run_content(graph, thread_id, client, content_types=(), question=None, **run):
+    """Generate content types and answer question from a thread's finished brief; returns the final state
+
+    Only what the thread has no result for yet is generated; run is as for run_brief. Each call
+    branches from the thread's latest checkpoint and runs only its own branch, so concurrent calls
+    on one thread don't pick up each other's work. The thread's latest state is whichever branch
+    finished last; anything missing from it is generated again on request, from the response cache.
+    """
+    config = _config(thread_id, client, run)
+    values = graph.get_state(config).values
+    missing = [content_type for content_type in content_types if content_type not in values.get("content", {})]
+    ask = question if question and values.get("answered") != question else None
+    if not missing and not ask:
+        return values
+    # Carrying values over keeps the results of an interrupted run that never reached a checkpoint
+    branch = graph.update_state(config, {**values, "content_types": missing, "question": ask}, as_node="brief")
+    return graph.invoke(None, {"configurable": {**config["configurable"], **branch["configurable"]}})
+
+
+def run_campaign_graph(graph, thread_id, client, inputs, content_types=(), question=None, **run):
+    """Run one campaign to completion: run_brief, then run_content from its brief"""
+    run_brief(graph, thread_id, client, inputs, **run)
+    return run_content(graph, thread_id, client, content_types, question, **run)
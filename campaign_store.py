@@ -0,0 +1,114 @@
+"""Durable campaign history: each user's briefs, content and chat in SQLite, across sessions and restarts
+
+A campaign's searchable fields are plain indexed columns. Everything needed to restore it sits in
+one zlib-compressed JSON payload, so listing history never reads the large text and restoring a
+campaign is a single primary-key read. History is paged by keyset on (created_at, id), so later
+pages cost the same as the first.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+HISTORY_PAGE_SIZE = 10
+FILTER_COLUMNS = ("brand_archetype", "positioning", "journey_stage")
+
+
+def _pack(payload):
+    return zlib.compress(json.dumps(payload).encode())
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob))
+
+
+class CampaignStore:
+    """Store and page through campaigns per user"""
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # WAL lets other processes read while one writes; the timeout covers their write lock
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS campaigns ("
+            "id INTEGER PRIMARY KEY, user_id TEXT NOT NULL, brand_archetype TEXT NOT NULL, "
+            "positioning TEXT NOT NULL, journey_stage TEXT NOT NULL, campaign_goal TEXT NOT NULL, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        # Every history query filters on user_id and pages on (created_at, id)
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS campaigns_user_created ON campaigns (user_id, created_at, id)"
+        )
+        for column in FILTER_COLUMNS:
+            self._db.execute(
+                f"CREATE INDEX IF NOT EXISTS campaigns_user_{column} ON campaigns (user_id, {column}, created_at, id)"
+            )
+        self._db.commit()
+
+    def create(self, user_id, inputs, payload):
+        """Store a new campaign for inputs (see brief_schema.campaign_inputs) and return its id"""
+        now = time.time()
+        with self._lock:
+            campaign_id = self._db.execute(
+                "INSERT INTO campaigns (user_id, brand_archetype, positioning, journey_stage, campaign_goal, "
+                "created_at, updated_at, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (user_id, inputs["brand_archetype"], inputs["positioning"], inputs["journey_stage"],
+                 inputs["campaign_goal"], now, now, _pack(payload))
+            ).lastrowid
+            self._db.commit()
+        return campaign_id
+
+    def update(self, user_id, campaign_id, payload):
+        """Replace a campaign's payload, e.g. once content or chat has been added"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE campaigns SET payload = ?, updated_at = ? WHERE id = ? AND user_id = ?",
+                (_pack(payload), time.time(), campaign_id, user_id)
+            )
+            self._db.commit()
+
+    def load(self, user_id, campaign_id):
+        """A campaign's payload, or None if user_id has no such campaign"""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload FROM campaigns WHERE id = ? AND user_id = ?", (campaign_id, user_id)
+            ).fetchone()
+        return _unpack(row[0]) if row else None
+
+    def page(self, user_id, after=None, limit=HISTORY_PAGE_SIZE, **filters):
+        """One page of user_id's campaigns, newest first, and the cursor for the next page (None at the end)
+
+        after is the cursor returned with the previous page. filters narrow the history by
+        brand_archetype, positioning and/or journey_stage.
+        """
+        clauses = ["user_id = ?"]
+        params = [user_id]
+        for column in FILTER_COLUMNS:
+            if filters.get(column):
+                clauses.append(f"{column} = ?")
+                params.append(filters[column])
+        if after is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(after)
+
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, campaign_goal, brand_archetype, positioning, journey_stage, created_at FROM campaigns "
+                f"WHERE {' AND '.join(clauses)} ORDER BY created_at DESC, id DESC LIMIT ?",
+                params + [limit + 1]
+            ).fetchall()
+
+        entries = [
+            {"id": row[0], "campaign_goal": row[1], "brand_archetype": row[2], "positioning": row[3],
+             "journey_stage": row[4], "created_at": row[5]}
+            for row in rows[:limit]
+        ]
+        cursor = (entries[-1]["created_at"], entries[-1]["id"]) if len(rows) > limit else None
+        return entries, cursor
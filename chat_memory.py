@@ -0,0 +1,68 @@
+"""Token-budgeted multi-turn chat memory: recent turns verbatim, older turns folded into a running summary"""
+from generation import CHARS_PER_TOKEN
+
+# Budget for the conversation part of each chat request; the brief itself travels as cached context
+CHAT_TOKEN_BUDGET = 3000
+# Always keep at least this many of the latest messages verbatim, even over budget
+MIN_RECENT_MESSAGES = 2
+SUMMARY_WORD_LIMIT = 200
+
+SPEAKERS = {
+    "user": "User",
+    "assistant": "Strategist"
+}
+
+
+def count_tokens(text):
+    """Local token estimate, so budgeting never costs a round trip"""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def format_turns(turns):
+    return "\n\n".join(f"{SPEAKERS.get(turn['role'], turn['role'])}: {turn['content']}" for turn in turns)
+
+
+def plan_history(summary, turns, question, budget=CHAT_TOKEN_BUDGET):
+    """Split turns into (to_summarize, recent) so summary, recent turns and question fit the budget
+
+    Recent turns are kept newest first until the next one would overflow the budget.
+    """
+    used = count_tokens(summary or "") + count_tokens(question)
+    kept = 0
+    for turn in reversed(turns):
+        cost = count_tokens(turn["content"])
+        if used + cost > budget and kept >= MIN_RECENT_MESSAGES:
+            break
+        used += cost
+        kept += 1
+
+    split = len(turns) - kept
+    return turns[:split], turns[split:]
+
+
+def build_summary_prompt(summary, turns):
+    """Prompt that folds newly aged-out turns into the existing running summary"""
+    return f"""
+    You maintain a running summary of a marketing strategy conversation.
+
+    CURRENT SUMMARY:
+    {summary or "(none yet)"}
+
+    NEW CONVERSATION TO FOLD IN:
+    {format_turns(turns)}
+
+    Rewrite the summary to include the new conversation. Keep decisions, constraints, preferences
+    and open questions; drop pleasantries. Stay under {SUMMARY_WORD_LIMIT} words.
+    """
+
+
+def build_chat_instruction(summary, recent, question):
+    """Chat instruction carrying the summary, the verbatim recent turns and the new question"""
+    sections = []
+    if summary:
+        sections.append(f"EARLIER CONVERSATION (SUMMARY):\n{summary}")
+    if recent:
+        sections.append(f"RECENT CONVERSATION:\n{format_turns(recent)}")
+    sections.append(f"USER QUESTION: {question}")
+    sections.append("Provide strategic, actionable advice based on the brief above and the conversation so far.")
+    return "\n\n".join(sections)
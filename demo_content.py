@@ -0,0 +1,95 @@
+"""Static demo content shown when no API key is configured
+
+Kept out of app_main.py so it is loaded once per process instead of on every script rerun.
+These samples are the fallback when no demo pack has been built (see build_demo_pack.py).
+"""
+
+# Goal prefilled for visitors without a key, and the goal every demo pack entry is generated for
+DEMO_CAMPAIGN_GOAL = "Launch sustainable coffee brand targeting eco-conscious millennials"
+
+DEMO_BRIEF = """
+# 🎯 Creative Brief: Eco-Friendly Coffee Launch
+
+## 1. TARGET AUDIENCE PERSONA
+**Primary Audience:** Millennials & Gen Z (25-40 years old)
+- **Demographics:** Urban professionals, college-educated, $60K+ annual income
+- **Psychographics:** Value sustainability, health-conscious, tech-savvy, experience-driven
+- **Behaviors:** Active on social media, research purchases online, prefer authentic brands
+
+## 2. BRAND POSITIONING & MESSAGING
+**Key Messaging Pillars:**
+1. **Sustainable innovation** that doesn't compromise quality
+2. **Empowering customers** to make conscious choices  
+3. **Building community** around shared values
+
+**Brand Voice:** Authentic, Inspiring, Knowledgeable
+**Unique Selling Proposition:** Premium organic coffee with carbon-neutral supply chain
+
+## 3. CREATIVE DIRECTION
+**Visual Style:** Clean, natural aesthetics with bold accent colors
+**Content Themes:** Sustainability stories, user-generated content, educational content
+**Call-to-Action Strategy:** Focus on community building and trial offers
+
+---
+
+*Note: This is a demo brief. Enter your Gemini API key to generate personalized AI-powered creative briefs.*
+"""
+
+DEMO_SOCIAL_MEDIA = """
+## 📱 Social Media Posts
+
+**Post 1: Brand Story**
+🎯 **Visual:** Behind-the-scenes of coffee farming
+💬 **Caption:** "From our sustainable farms to your morning cup - every bean tells a story of positive impact. ☕️🌱 #SustainableCoffee #EcoFriendly"
+🏷️ **Hashtags:** #CoffeeLovers #EcoWarrior #MorningRitual
+
+**Post 2: Product Highlight**  
+🎯 **Visual:** Artistic shot of coffee packaging
+💬 **Caption:** "Packaged with purpose, brewed with passion. Our compostable packaging is just the beginning. ♻️"
+🏷️ **Hashtags:** #ZeroWaste #EcoPackaging #GreenLiving
+
+**Post 3: Community Engagement**
+🎯 **Visual:** User-generated content collage
+💬 **Caption:** "How do you take your sustainable brew? Share your morning routine with us! 👇"
+🏷️ **Hashtags:** #CoffeeCommunity #SustainableLiving #ShareYourBrew
+"""
+
+DEMO_EMAIL_COPY = """
+## 📧 Email Campaign
+
+**Variation 1: Welcome Series**
+**Subject:** Start Your Sustainable Coffee Journey ☕️  
+**Preheader:** Discover how your morning brew can make a difference
+
+**Body:**
+Welcome to the revolution! We're thrilled to have you join our community of conscious coffee lovers. 
+
+✨ **What makes us different:**
+• Carbon-neutral supply chain
+• Direct trade with farmers
+• 100% compostable packaging
+
+**CTA:** [Explore Our Blends]
+
+---
+
+**Variation 2: Educational Content**
+**Subject:** The Truth About Sustainable Coffee 🌱
+**Preheader:** 5 things every coffee drinker should know
+
+**Body:**
+Did you know traditional coffee farming contributes to deforestation? We're changing that, one cup at a time.
+
+📚 **In this email:**
+- The impact of shade-grown coffee
+- How direct trade supports farmers
+- Our sustainability certifications
+
+**CTA:** [Learn More About Our Mission]
+"""
+
+DEMO_CONTENT = {
+    "social_media": DEMO_SOCIAL_MEDIA,
+    "email_copy": DEMO_EMAIL_COPY,
+    "ad_copy": "**Demo Ad Copy:** Enter API key to generate personalized ad variations..."
+}
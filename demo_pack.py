@@ -0,0 +1,106 @@
+"""Precomputed demo pack: a brief and every content type for each archetype × positioning × journey stage
+
+Built ahead of time by build_demo_pack.py, so demo traffic never calls the API. The file is a
+small JSON header, a fixed-size index with one slot per (archetype, positioning, stage, kind) and
+the zlib-compressed texts. It is memory-mapped, so a lookup reads one index slot and one text
+instead of loading the whole pack.
+"""
+import json
+import mmap
+import os
+import struct
+import zlib
+
+DEMO_PACK_PATH = os.getenv("DEMO_PACK_PATH", "demo/demo_pack.bin")
+
+MAGIC = b"DEMOPACK"
+FORMAT_VERSION = 1
+# magic, format version, header length
+PREAMBLE = struct.Struct("<8sII")
+# text offset from the start of the file, compressed length (0 for a missing text)
+SLOT = struct.Struct("<QI")
+
+
+def write_demo_pack(path, texts, archetypes, positionings, stages, kinds, version):
+    """Write a demo pack from texts keyed by (archetype, positioning, stage, kind)
+
+    version identifies the pack's content (e.g. the date and model it was generated with) and
+    ends up in the header; combinations missing from texts get empty slots.
+    """
+    header = json.dumps({
+        "version": version,
+        "archetypes": list(archetypes),
+        "positionings": list(positionings),
+        "stages": list(stages),
+        "kinds": list(kinds)
+    }).encode()
+
+    slot_keys = [
+        (archetype, positioning, stage, kind)
+        for archetype in archetypes for positioning in positionings for stage in stages for kind in kinds
+    ]
+    blobs = [zlib.compress(texts[key].encode(), 9) if key in texts else b"" for key in slot_keys]
+
+    offset = PREAMBLE.size + len(header) + SLOT.size * len(slot_keys)
+    index = bytearray()
+    for blob in blobs:
+        index += SLOT.pack(offset if blob else 0, len(blob))
+        offset += len(blob)
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Written beside the live pack and swapped in, so a running app never maps a half-written file
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header)))
+        f.write(header)
+        f.write(index)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, path)
+
+
+class DemoPack:
+    """Read-only, memory-mapped view of a demo pack"""
+
+    def __init__(self, path=DEMO_PACK_PATH):
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, format_version, header_length = PREAMBLE.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a demo pack")
+        if format_version != FORMAT_VERSION:
+            raise ValueError(f"{path} is demo pack format {format_version}, expected {FORMAT_VERSION}")
+
+        header = json.loads(self._map[PREAMBLE.size:PREAMBLE.size + header_length])
+        self.version = header["version"]
+        self._axes = [
+            {name: i for i, name in enumerate(header[axis])}
+            for axis in ("archetypes", "positionings", "stages", "kinds")
+        ]
+        self._index_offset = PREAMBLE.size + header_length
+
+    def get(self, archetype, positioning, stage, kind):
+        """Text for one combination and kind ("brief" or a content type), or None if the pack lacks it"""
+        slot = 0
+        for axis, name in zip(self._axes, (archetype, positioning, stage, kind)):
+            if name not in axis:
+                return None
+            slot = slot * len(axis) + axis[name]
+
+        offset, length = SLOT.unpack_from(self._map, self._index_offset + slot * SLOT.size)
+        if not length:
+            return None
+        return zlib.decompress(self._map[offset:offset + length]).decode()
+
+    def close(self):
+        self._map.close()
+
+
+def open_demo_pack(path=DEMO_PACK_PATH):
+    """The demo pack at path, or None when it has not been built or can't be read"""
+    try:
+        return DemoPack(path)
+    except (OSError, ValueError, struct.error):
+        return None
@@ -0,0 +1,73 @@
+"""Process-wide registry of Gemini clients, one per API key, sharing pooled keep-alive connections"""
+import threading
+from collections import OrderedDict
+
+# Keys with a pooled client; the least recently used one is dropped beyond this
+MAX_CLIENTS = 32
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+KEEPALIVE_EXPIRY_SECONDS = 120.0
+REQUEST_TIMEOUT_SECONDS = 120.0
+WARM_UP_MODEL = "gemini-2.5-flash"
+
+
+class ClientPool:
+    """Hand out one shared genai.Client per API key instead of one per session"""
+
+    def __init__(self, max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                 keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS, timeout=REQUEST_TIMEOUT_SECONDS, base_url=None,
+                 max_clients=MAX_CLIENTS):
+        self._limits = {
+            "max_connections": max_connections,
+            "max_keepalive_connections": max_keepalive_connections,
+            "keepalive_expiry": keepalive_expiry
+        }
+        self._timeout = timeout
+        # Points every client at another endpoint, e.g. benchmarks/fake_gemini.py
+        self._base_url = base_url
+        self._max_clients = max_clients
+        # api_key -> genai client, least recently used first
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, api_key):
+        """Return the shared client for api_key, creating it on first use
+
+        Beyond max_clients keys, the least recently used key's client is dropped, so visitors'
+        keys don't pile up in memory. It is not closed: sessions and running jobs may still hold it,
+        and its connections are released once the last of them lets it go.
+        """
+        with self._lock:
+            if api_key in self._clients:
+                self._clients.move_to_end(api_key)
+                return self._clients[api_key]
+
+            # Imported here so the SDK's import cost is paid on first use, not on first page render
+            import httpx
+            from google import genai
+            from google.genai import types
+
+            http_client = httpx.Client(limits=httpx.Limits(**self._limits), timeout=self._timeout)
+            client = genai.Client(
+                api_key=api_key,
+                http_options=types.HttpOptions(base_url=self._base_url, httpx_client=http_client)
+            )
+            self._clients[api_key] = client
+            while len(self._clients) > self._max_clients:
+                self._clients.popitem(last=False)
+            return client
+
+    def warm_up(self, api_key, model=WARM_UP_MODEL):
+        """Open a pooled connection for api_key so the first generation skips DNS and TLS setup"""
+        try:
+            self.get(api_key).models.get(model=model)
+        except Exception:
+            # Warm-up is best effort; a bad key surfaces on the first real call
+            pass
+
+    def warm_up_in_background(self, api_key, model=WARM_UP_MODEL):
+        """Run warm_up on a daemon thread so it never delays a page render"""
+        threading.Thread(target=self.warm_up, args=(api_key, model), daemon=True).start()
+
+    def __len__(self):
+        return len(self._clients)
@@ -0,0 +1,223 @@
+"""Streamlit-free generation core: instrumented model calls behind the response cache
+
+Everything here is safe to call from worker threads and from headless batch runs.
+"""
+import os
+import random
+import time
+from types import SimpleNamespace
+
+from brief_context import build_request
+from brief_schema import section_label
+from call_metrics import METRICS_LOG_PATH, CallMetrics, usage_fields
+from hedging import Hedger, with_timeout
+from model_router import MODEL_REGISTRY_PATH, ModelRouter
+from prompts import SECTION_INPUTS, build_adapt_prompt, build_section_prompt
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache, make_cache_key
+from single_flight import SingleFlight
+
+RESPONSE_CACHE_PATH = ".cache/responses.sqlite3"
+
+# Shared-key quota; override per deployment
+REQUESTS_PER_MINUTE = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "60"))
+TOKENS_PER_MINUTE = int(os.getenv("GEMINI_TOKENS_PER_MINUTE", "250000"))
+
+RETRYABLE_STATUS_CODES = (429, 503)
+MAX_ATTEMPTS = 5
+RETRY_BASE_DELAY = 1.0
+RETRY_MAX_DELAY = 30.0
+
+CHARS_PER_TOKEN = 4
+IMAGE_TOKENS = 258
+EXPECTED_RESPONSE_TOKENS = 1000
+
+
+def create_runtime(cache_path=RESPONSE_CACHE_PATH, metrics_path=METRICS_LOG_PATH,
+                   requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                   registry_path=MODEL_REGISTRY_PATH):
+    """Bundle the process-wide services that generation code needs"""
+    return SimpleNamespace(
+        cache=ResponseCache(cache_path),
+        metrics=CallMetrics(metrics_path),
+        limiter=RateLimiter(requests_per_minute, tokens_per_minute),
+        flights=SingleFlight(),
+        hedger=Hedger(),
+        router=ModelRouter.from_config(registry_path)
+    )
+
+
+def estimate_tokens(contents):
+    """Rough token count for admission control, before the real count is known"""
+    parts = contents if isinstance(contents, list) else [contents]
+    tokens = EXPECTED_RESPONSE_TOKENS
+    for part in parts:
+        tokens += len(part) // CHARS_PER_TOKEN if isinstance(part, str) else IMAGE_TOKENS
+    return tokens
+
+
+def is_retryable(error):
+    from google.genai import errors
+
+    return isinstance(error, errors.APIError) and error.code in RETRYABLE_STATUS_CODES
+
+
+def stream_generate(client, model, contents, on_chunk, config=None):
+    """Stream a generation, passing the text so far to on_chunk
+
+    Returns the text, time-to-first-token and the usage metadata from the final chunk.
+    """
+    start = time.perf_counter()
+    time_to_first_token = None
+    text = ""
+    usage_metadata = None
+
+    for chunk in client.models.generate_content_stream(model=model, contents=contents, config=config):
+        if chunk.usage_metadata is not None:
+            usage_metadata = chunk.usage_metadata
+        if not chunk.text:
+            continue
+        if time_to_first_token is None:
+            time_to_first_token = time.perf_counter() - start
+        text += chunk.text
+        on_chunk(text)
+
+    return text, time_to_first_token, usage_metadata
+
+
+def call_model(client, runtime, model, contents, label, config=None, on_chunk=None, on_wait=None, background=None,
+               on_admit=None):
+    """Make one rate-limited, instrumented model call, streaming through on_chunk when given
+
+    Every model call goes through here so it is admitted by the shared rate limiter, retried with
+    jittered backoff on 429/503, and every attempt lands in the metrics log. on_wait(position, seconds)
+    is called while queued for capacity; background is passed to the rate limiter for low-priority
+    calls. on_admit() is called once the rate limiter first admits the call. Returns the text and
+    time-to-first-token (None unless streaming).
+    """
+    estimated_tokens = estimate_tokens(contents)
+
+    for attempt in range(MAX_ATTEMPTS):
+        ticket = runtime.limiter.acquire(estimated_tokens, on_wait, background)
+        if on_admit is not None and attempt == 0:
+            on_admit()
+        actual_tokens = None
+        try:
+            with runtime.metrics.track(label, model) as record:
+                record["attempt"] = attempt + 1
+                if on_chunk is not None:
+                    text, ttft, usage_metadata = stream_generate(client, model, contents, on_chunk, config)
+                else:
+                    response = client.models.generate_content(model=model, contents=contents, config=config)
+                    text, ttft, usage_metadata = response.text, None, response.usage_metadata
+                record["time_to_first_token"] = ttft
+                record.update(usage_fields(usage_metadata))
+                if usage_metadata is not None:
+                    actual_tokens = usage_metadata.total_token_count
+        except BaseException as e:
+            # BaseException too: a cancelled job or an interrupted script run must still free its slot
+            runtime.limiter.release(ticket, throttled=is_retryable(e))
+            if not is_retryable(e) or attempt == MAX_ATTEMPTS - 1:
+                raise
+            # Full jitter keeps retries from many sessions from arriving in lockstep
+            time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+            continue
+
+        runtime.limiter.release(ticket, actual_tokens)
+        return text, ttft
+
+
+def generate_text(client, runtime, model, prompt, label, image=None, on_chunk=None, context=None, on_wait=None,
+                  background=None, deadline=None):
+    """Generate text through the response cache without touching Streamlit, so it is safe in worker threads
+
+    When context is given, prompt is an instruction that follows the brief registered in context.
+    Concurrent identical requests (same model, normalized prompt and image) share one model call.
+    With a deadline (seconds), the call runs under the latency SLO: it fails with TimeoutError past
+    the deadline, and a slow first attempt gets a hedged duplicate (see hedging.py).
+    Returns (text, time_to_first_token, from_cache); time_to_first_token is only measured when streaming,
+    and from_cache is also True when the text came from another caller's in-flight call.
+    """
+    full_prompt = context["prefix"] + prompt if context else prompt
+    cache_key = make_cache_key(model, full_prompt, image["model_bytes"] if image else None)
+
+    cached = runtime.cache.get(cache_key)
+    if cached is not None:
+        runtime.metrics.record(call=label, model=model, cache_status="hit", latency=0.0, error=None)
+        return cached, None, True
+
+    config = None
+    if context:
+        contents, config = build_request(context, prompt, model=model)
+    elif image:
+        from google.genai import types
+
+        contents = [prompt, types.Part.from_bytes(data=image["model_bytes"], mime_type=image["mime_type"])]
+    else:
+        contents = prompt
+
+    def attempt(is_hedge, attempt_on_chunk, on_admit):
+        attempt_label = f"{label}:hedge" if is_hedge else label
+        return call_model(
+            client, runtime, model, contents, attempt_label, with_timeout(config, deadline), attempt_on_chunk,
+            on_wait, background, on_admit
+        )
+
+    def generate():
+        if deadline:
+            text, ttft = runtime.hedger.call(attempt, (label, model, on_chunk is not None), on_chunk, deadline)
+        else:
+            text, ttft = call_model(client, runtime, model, contents, label, config, on_chunk, on_wait, background)
+        # Cache before the flight lands, so no caller can slip between the two and call the model again
+        if text:
+            runtime.cache.set(cache_key, text)
+        return text, ttft
+
+    start = time.perf_counter()
+    (text, ttft), shared = runtime.flights.do(cache_key, generate)
+    if shared:
+        runtime.metrics.record(
+            call=label, model=model, cache_status="shared", latency=time.perf_counter() - start, error=None
+        )
+        return text, None, True
+    return text, ttft, False
+
+
+def generate_routed(client, runtime, prompt, label, image=None, on_chunk=None, context=None, on_wait=None,
+                    background=None, deadline=None):
+    """generate_text on the cheapest capable model, escalating along the router's cascade
+
+    A model whose output fails the router's cheap validation hands over to the next one; the
+    last model's output is returned as it is.
+    """
+    full_prompt = context["prefix"] + prompt if context else prompt
+    models = runtime.router.route(label, len(full_prompt) // CHARS_PER_TOKEN, image is not None)
+
+    for model in models:
+        text, ttft, from_cache = generate_text(
+            client, runtime, model, prompt, label, image, on_chunk, context, on_wait, background, deadline
+        )
+        if model == models[-1] or runtime.router.is_acceptable(label, text):
+            break
+        runtime.router.record_escalation()
+
+    runtime.router.record(model)
+    return text, ttft, from_cache
+
+
+def generate_section(client, runtime, field, inputs, image=None, on_chunk=None, on_wait=None, background=None,
+                     deadline=None, seed=None):
+    """generate_routed for one brief section; image is only sent to sections that depend on it
+
+    With seed, the text of this section from a similar campaign's brief, the section is adapted
+    from it rather than written from scratch.
+    """
+    if "image" not in SECTION_INPUTS[field]:
+        image = None
+    if seed:
+        prompt, label = build_adapt_prompt(field, inputs, seed), f"adapt_brief:{field}"
+    else:
+        prompt, label = build_section_prompt(field, inputs), section_label(field)
+    return generate_routed(
+        client, runtime, prompt, label, image, on_chunk, on_wait=on_wait, background=background, deadline=deadline
+    )
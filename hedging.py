@@ -0,0 +1,189 @@
+"""Latency SLO for model calls: a deadline per call, and one hedged duplicate when the first attempt runs slow
+
+An attempt that has made no progress (first streamed chunk, or the whole response) by the
+HEDGE_PERCENTILE of recent latency gets a duplicate request. Latency is counted from when the rate
+limiter admits an attempt, so time spent queued for capacity neither triggers a hedge (which would
+only queue behind it) nor inflates the latencies hedging learns from. Whichever attempt finishes first
+wins and the other is cancelled. Hedges are paid for from a budget that earns HEDGE_BUDGET_RATIO
+of a request per call, so hedging adds at most that fraction of extra spend and leaves the
+median untouched.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from call_metrics import percentile
+
+DEADLINE_SECONDS = 90.0
+HEDGE_PERCENTILE = 95
+# No hedging until this many latencies have been seen for a call, so a cold start can't hedge everything
+MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_BUDGET_BURST = 5.0
+MAX_WORKERS = 16
+
+
+class AttemptCancelled(BaseException):
+    """Raised inside the losing attempt at its next streamed chunk"""
+
+
+class Hedger:
+    """Run calls against a deadline, hedging the slow ones within a spend budget"""
+
+    def __init__(self, deadline_seconds=DEADLINE_SECONDS, hedge_percentile=HEDGE_PERCENTILE,
+                 min_samples=MIN_SAMPLES, budget_ratio=HEDGE_BUDGET_RATIO, budget_burst=HEDGE_BUDGET_BURST,
+                 max_workers=MAX_WORKERS):
+        self.deadline_seconds = deadline_seconds
+        self.hedge_percentile = hedge_percentile
+        self.min_samples = min_samples
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.budget = budget_burst
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.over_budget = 0
+        self.deadlines_missed = 0
+
+        self._latencies = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-call")
+
+    def observe(self, key, seconds):
+        """Record how long an attempt took to make progress"""
+        with self._lock:
+            self._latencies.setdefault(key, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+    def hedge_delay(self, key):
+        """Seconds without progress after which a call for key gets hedged, or None while still learning"""
+        with self._lock:
+            latencies = list(self._latencies.get(key, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        return percentile(latencies, self.hedge_percentile)
+
+    def call(self, attempt, key, on_chunk=None, deadline_seconds=None):
+        """Return the first successful result of attempt(is_hedge, on_chunk, on_admit), hedged and under a deadline
+
+        attempt must hand on_chunk to a streaming call when it is given; the losing attempt is
+        cancelled through it. attempt calls on_admit() once it stops waiting and starts its request,
+        e.g. when the rate limiter admits it; the first attempt isn't hedged before that. Raises
+        TimeoutError once the deadline passes, counted from this call.
+        """
+        deadline_seconds = deadline_seconds or self.deadline_seconds
+        start = time.monotonic()
+        deadline = start + deadline_seconds
+        with self._lock:
+            self.budget = min(self.budget_burst, self.budget + self.budget_ratio)
+
+        cancels = []
+        progress = []
+        admissions = []
+        leader = []
+
+        def launch(is_hedge):
+            cancel = threading.Event()
+            progressed = threading.Event()
+            # Resolves to the time the attempt was admitted
+            admitted = Future()
+            cancels.append(cancel)
+            progress.append(progressed)
+            admissions.append(admitted)
+
+            def admit():
+                if not admitted.done():
+                    admitted.set_result(time.monotonic())
+
+            def chunk(partial):
+                if cancel.is_set():
+                    raise AttemptCancelled()
+                if not progressed.is_set():
+                    progressed.set()
+                    self.observe(key, time.monotonic() - admitted.result())
+                with self._lock:
+                    if not leader:
+                        leader.append(progressed)
+                # Only the first attempt to stream is shown, so the two never interleave
+                if leader[0] is progressed:
+                    on_chunk(partial)
+
+            def run():
+                result = attempt(is_hedge, chunk if on_chunk is not None else None, admit)
+                if on_chunk is None and admitted.done():
+                    self.observe(key, time.monotonic() - admitted.result())
+                return result
+
+            return self._executor.submit(run)
+
+        pending = {launch(False): False}
+        hedge_at = self.hedge_delay(key)
+        error = None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    with self._lock:
+                        self.deadlines_missed += 1
+                    raise TimeoutError(f"No response within the {deadline_seconds:g}s deadline")
+
+                timeout = deadline - now
+                waiting_for = set(pending)
+                if hedge_at is not None and not progress[0].is_set():
+                    if not admissions[0].done():
+                        # Still queued: wake on admission to start the hedge timer
+                        waiting_for.add(admissions[0])
+                    elif now - admissions[0].result() >= hedge_at:
+                        hedge_at = None
+                        if self._spend():
+                            pending[launch(True)] = True
+                        continue
+                    else:
+                        timeout = min(timeout, admissions[0].result() + hedge_at - now)
+
+                done, _ = wait(waiting_for, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done & pending.keys():
+                    is_hedge = pending.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        if is_hedge:
+                            with self._lock:
+                                self.hedge_wins += 1
+                        return future.result()
+                    if not isinstance(error, Exception):
+                        # e.g. the job was cancelled: stop right away instead of waiting for the other attempt
+                        raise error
+                    # A failed first attempt is not hedged; its own retries have already run
+                    hedge_at = None
+            raise error
+        finally:
+            for cancel in cancels:
+                cancel.set()
+
+    def _spend(self):
+        with self._lock:
+            if self.budget < 1:
+                self.over_budget += 1
+                return False
+            self.budget -= 1
+            self.hedged += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "over_budget": self.over_budget,
+                "deadlines_missed": self.deadlines_missed
+            }
+
+
+def with_timeout(config, seconds):
+    """Copy of a GenerateContentConfig (or a new one) whose HTTP requests time out after seconds"""
+    from google.genai import types
+
+    http_options = types.HttpOptions(timeout=int(seconds * 1000))
+    if config is None:
+        return types.GenerateContentConfig(http_options=http_options)
+    return config.model_copy(update={"http_options": http_options})
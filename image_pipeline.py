@@ -0,0 +1,54 @@
+"""Decode an uploaded image once and derive a bounded model payload and a display thumbnail"""
+import hashlib
+import io
+
+MODEL_MAX_EDGE = 1024
+MODEL_FORMAT = "JPEG"
+MODEL_QUALITY = 85
+THUMBNAIL_MAX_EDGE = 480
+THUMBNAIL_QUALITY = 80
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "WEBP": "image/webp"
+}
+
+
+def _encode(image, max_edge, image_format, quality):
+    """Downscale a copy of image to fit max_edge and encode it"""
+    from PIL import Image
+
+    resized = image.copy()
+    resized.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+    buffer = io.BytesIO()
+    resized.save(buffer, format=image_format, quality=quality)
+    return buffer.getvalue()
+
+
+def prepare_image(data, max_edge=MODEL_MAX_EDGE, image_format=MODEL_FORMAT, quality=MODEL_QUALITY,
+                  thumbnail_edge=THUMBNAIL_MAX_EDGE):
+    """Decode raw upload bytes into a model payload and a thumbnail, keyed by the upload's content hash"""
+    # PIL is only needed once someone uploads an image, so keep it off the cold-start path
+    from PIL import Image, ImageOps
+
+    image = Image.open(io.BytesIO(data))
+
+    # Let the JPEG decoder skip detail we are about to throw away
+    image.draft("RGB", (max_edge, max_edge))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        # JPEG has no alpha; flatten onto white so transparent product shots don't turn black
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, "white")
+        image.paste(rgba, mask=rgba.getchannel("A"))
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+
+    return {
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "model_bytes": _encode(image, max_edge, image_format, quality),
+        "mime_type": MIME_TYPES[image_format],
+        "thumbnail_bytes": _encode(image, thumbnail_edge, "JPEG", THUMBNAIL_QUALITY),
+        "original_size": len(data)
+    }
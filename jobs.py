@@ -0,0 +1,166 @@
+"""Background generation jobs on a shared executor, so script runs never block on a model call
+
+A job runs outside any Streamlit script run. It reports partial output and its queue position
+as it goes, and can be cancelled. Finished jobs keep their result until the owning session
+collects it, so the result survives reruns. Jobs nobody collects expire after a TTL.
+"""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 8
+# Background jobs get their own small pool, so a backlog of them never delays foreground jobs
+BACKGROUND_WORKERS = 2
+JOB_TTL_SECONDS = 3600
+# A queue position older than this is from before the job was admitted
+QUEUE_REPORT_STALE_SECONDS = 2.5
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(BaseException):
+    """Raised inside a cancelled job at its next progress report
+
+    A BaseException, so generic error handling on the way out does not mistake it for a failure.
+    Single-flight waiters then rerun the call instead of inheriting the cancellation.
+    """
+
+
+class Job:
+    """State of one background job, written by its worker thread and read by script runs"""
+
+    def __init__(self, label, background=False):
+        self.id = uuid.uuid4().hex
+        self.label = label
+        self.background = background
+        self.status = QUEUED
+        self.partial = ""
+        self.queue_position = None
+        self.queue_reported_at = 0.0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+
+    @property
+    def finished(self):
+        return self.status in FINISHED
+
+    def cancel(self):
+        self._cancel.set()
+
+    def is_background(self):
+        """Rate-limiter priority callback: True until the job is promoted"""
+        return self.background
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled(self.id)
+
+    def report(self, partial):
+        """on_chunk callback: record the text so far"""
+        self.check_cancelled()
+        self.partial = partial
+
+    def waiting(self, position, seconds):
+        """on_wait callback: record the job's place in the rate-limit queue"""
+        self.check_cancelled()
+        self.queue_position = (position, seconds)
+        self.queue_reported_at = time.monotonic()
+
+    def queue_status(self):
+        """(position, seconds) while the job waits in the rate-limit queue, otherwise None"""
+        if self.queue_position and time.monotonic() - self.queue_reported_at < QUEUE_REPORT_STALE_SECONDS:
+            return self.queue_position
+        return None
+
+
+class JobManager:
+    """Run jobs on one process-wide executor and keep their state until collected or expired"""
+
+    def __init__(self, max_workers=MAX_WORKERS, background_workers=BACKGROUND_WORKERS, ttl_seconds=JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="generation-job")
+        self._background_executor = ThreadPoolExecutor(
+            max_workers=background_workers, thread_name_prefix="background-job"
+        )
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.completed = 0
+
+    def submit(self, label, fn, *args, stream=False, background=False, **kwargs):
+        """Run fn(*args, on_chunk=..., on_wait=..., **kwargs) in the background and return the job id
+
+        on_chunk is only passed a progress callback when stream is set, so non-streaming calls
+        keep using the cheaper single-response API. A background job also gets background=...,
+        a callback that keeps it behind foreground calls in the rate limiter until it is promoted.
+        """
+        job = Job(label, background)
+        with self._lock:
+            self._evict_expired()
+            self._jobs[job.id] = job
+        kwargs["on_chunk"] = job.report if stream else None
+        executor = self._executor
+        if background:
+            kwargs["background"] = job.is_background
+            executor = self._background_executor
+        executor.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        status = FAILED
+        try:
+            job.check_cancelled()
+            job.status = RUNNING
+            result = fn(*args, on_wait=job.waiting, **kwargs)
+            job.check_cancelled()
+            job.result = result
+            status = DONE
+        except JobCancelled:
+            status = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            # finished_at first: readers treat a finished status as having a finish time
+            job.finished_at = time.time()
+            job.status = status
+            with self._lock:
+                self.completed += 1
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id):
+        """Ask a job to stop; it does so at its next progress report, or before it starts"""
+        job = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def promote(self, job_id):
+        """Give a background job foreground priority, e.g. once someone is waiting for its result"""
+        job = self.get(job_id)
+        if job is not None:
+            job.background = False
+
+    def discard(self, job_id):
+        """Forget a job once its session has collected the result"""
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def stats(self):
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if not job.finished)
+            return {"active": active, "held": len(self._jobs) - active, "completed": self.completed}
+
+    def _evict_expired(self):
+        cutoff = time.time() - self.ttl_seconds
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]:
+            del self._jobs[job_id]
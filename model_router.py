@@ -0,0 +1,90 @@
+"""Pick a model per request from a registry, cheapest capable first, escalating when output fails validation
+
+The registry and quality tiers below are defaults; point MODEL_REGISTRY_PATH at a JSON file with
+"models" and/or "quality_tiers" to replace them without a code change.
+"""
+import json
+import os
+import threading
+from collections import Counter
+
+MODEL_REGISTRY_PATH = os.getenv("MODEL_REGISTRY_PATH")
+
+# cost is relative spend per token and only orders the cascade; max_prompt_tokens keeps
+# small models to small prompts
+MODEL_REGISTRY = {
+    "gemini-2.5-flash-lite": {"tier": 1, "cost": 1.0, "image": True, "max_prompt_tokens": 8000},
+    "gemini-2.5-flash": {"tier": 2, "cost": 3.0, "image": True, "max_prompt_tokens": 1_000_000},
+    "gemini-2.5-pro": {"tier": 3, "cost": 12.5, "image": True, "max_prompt_tokens": 1_000_000}
+}
+
+# Lowest model tier each call may use; a call labelled "name:part" uses the tier of "name"
+QUALITY_TIERS = {
+    "creative_brief": 1,
+    "adapt_brief": 1,
+    "social_media": 1,
+    "email_copy": 1,
+    "ad_copy": 2,
+    "chat": 2,
+    "chat_summary": 1
+}
+DEFAULT_TIER = 2
+
+# Anything shorter is treated as a truncated or refused response
+MIN_OUTPUT_CHARS = 200
+
+
+class ModelRouter:
+    """Route calls to models by modality, prompt size and quality tier, and judge their output"""
+
+    def __init__(self, models=None, quality_tiers=None):
+        self.models = models or MODEL_REGISTRY
+        self.quality_tiers = quality_tiers or QUALITY_TIERS
+        self.routed = Counter()
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, path=MODEL_REGISTRY_PATH):
+        """Router over the registry in a JSON file, or the defaults when path is None"""
+        if not path:
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        return cls(config.get("models"), config.get("quality_tiers"))
+
+    def route(self, label, prompt_tokens, has_image=False):
+        """Models to try for a call, cheapest first"""
+        tier = self.quality_tiers.get(label, self.quality_tiers.get(label.split(":")[0], DEFAULT_TIER))
+        candidates = [
+            name for name, spec in self.models.items()
+            if spec["tier"] >= tier and (spec["image"] or not has_image) and prompt_tokens <= spec["max_prompt_tokens"]
+        ]
+        if not candidates:
+            # Nothing fits the tier and size limits; the largest capable model is the best bet
+            candidates = [max(
+                (name for name, spec in self.models.items() if spec["image"] or not has_image),
+                key=lambda name: (self.models[name]["max_prompt_tokens"], self.models[name]["tier"])
+            )]
+        return sorted(candidates, key=lambda name: self.models[name]["cost"])
+
+    def context_model(self):
+        """Model the brief is registered for, so chat and top-tier content reuse its cached context"""
+        return self.route("chat", 0)[0]
+
+    def is_acceptable(self, label, text):
+        """Cheap output check: long enough not to be a truncated or refused response"""
+        return bool(text) and len(text.strip()) >= MIN_OUTPUT_CHARS
+
+    def record(self, model):
+        """Count the model whose output a call ended up using"""
+        with self._lock:
+            self.routed[model] += 1
+
+    def record_escalation(self):
+        with self._lock:
+            self.escalations += 1
+
+    def stats(self):
+        with self._lock:
+            return {"routed": dict(self.routed), "escalations": self.escalations}
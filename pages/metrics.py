@@ -0,0 +1,73 @@
+import streamlit as st
+from matplotlib.figure import Figure
+from call_metrics import PERCENTILES, load_records, render_prometheus, summarize
+
+st.set_page_config(
+    page_title="Model Call Metrics",
+    page_icon="📊",
+    layout="wide"
+)
+
+
+def plot_percentiles(summary, prefix, title):
+    """Grouped bar chart of p50/p95/p99 for each call"""
+    calls = sorted(summary)
+    width = 0.8 / len(PERCENTILES)
+
+    # Not pyplot: its figures stay registered (and leak) until closed, and it isn't thread-safe
+    fig = Figure(figsize=(8, 3.5))
+    ax = fig.subplots()
+    for offset, q in enumerate(PERCENTILES):
+        values = [summary[call][f"{prefix}_p{q}"] or 0 for call in calls]
+        ax.bar([i + offset * width for i in range(len(calls))], values, width, label=f"p{q}")
+
+    ax.set_xticks([i + width * (len(PERCENTILES) - 1) / 2 for i in range(len(calls))])
+    ax.set_xticklabels([call.replace('_', ' ').title() for call in calls])
+    ax.set_ylabel("seconds")
+    ax.set_title(title)
+    ax.legend()
+    fig.tight_layout()
+    return fig
+
+
+def main():
+    st.title("📊 Model Call Metrics")
+    st.markdown("Latency, token usage and errors for every Gemini call made by this server")
+
+    if st.button("🔄 Refresh"):
+        st.rerun()
+
+    records = load_records()
+    if not records:
+        st.info("No model calls recorded yet. Generate a brief to start collecting metrics.")
+        return
+
+    summary = summarize(records)
+
+    st.subheader("Summary")
+    st.dataframe(
+        [{"call": call, **stats} for call, stats in sorted(summary.items())],
+        use_container_width=True
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.pyplot(plot_percentiles(summary, "latency", "Total latency"))
+    with col2:
+        st.pyplot(plot_percentiles(summary, "ttft", "Time to first token (streamed calls)"))
+
+    st.subheader("Recent errors")
+    errors = [r for r in records if r.get("error")][-20:]
+    if errors:
+        st.dataframe(errors, use_container_width=True)
+    else:
+        st.success("No errors recorded")
+
+    st.subheader("Prometheus export")
+    prometheus_text = render_prometheus(records)
+    st.download_button("⬇️ Download metrics", prometheus_text, file_name="metrics.prom", mime="text/plain")
+    with st.expander("Prometheus text"):
+        st.code(prometheus_text)
+
+
+main()
@@ -0,0 +1,52 @@
+"""Speculative content prefetch: which content types to generate before anyone asks, and how often it pays off"""
+import threading
+from collections import Counter
+
+PREFETCH_TOP_N = 2
+
+
+class PrefetchPlanner:
+    """Rank content types by how often users pick them and track how many prefetches get used"""
+
+    def __init__(self, content_types, top_n=PREFETCH_TOP_N):
+        self.content_types = list(content_types)
+        self.top_n = top_n
+        self.picks = Counter()
+        self.started = 0
+        self.used = 0
+        self.discarded = 0
+        self._lock = threading.Lock()
+
+    def record_pick(self, content_type):
+        """Count a content type a user asked for on its own"""
+        with self._lock:
+            self.picks[content_type] += 1
+
+    def choose(self, exclude=()):
+        """The top_n most picked content types not in exclude; ties keep content_types order"""
+        with self._lock:
+            candidates = [ct for ct in self.content_types if ct not in exclude]
+            return sorted(candidates, key=lambda ct: -self.picks[ct])[:self.top_n]
+
+    def record_started(self, count):
+        with self._lock:
+            self.started += count
+
+    def record_used(self):
+        with self._lock:
+            self.used += 1
+
+    def record_discarded(self, count):
+        with self._lock:
+            self.discarded += count
+
+    def stats(self):
+        with self._lock:
+            settled = self.used + self.discarded
+            return {
+                "started": self.started,
+                "used": self.used,
+                "discarded": self.discarded,
+                "hit_rate": self.used / settled if settled else None,
+                "ranking": sorted(self.content_types, key=lambda ct: -self.picks[ct])
+            }
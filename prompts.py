@@ -0,0 +1,136 @@
+"""Marketing frameworks and prompt construction shared by the app and headless batch runs"""
+
+# Brand archetypes dictionary
+BRAND_ARCHETYPES = {
+    "hero": "Courageous, inspiring, overcoming challenges",
+    "rebel": "Disruptive, revolutionary, anti-establishment", 
+    "sage": "Wisdom, truth, expertise, knowledge-sharing",
+    "innocent": "Simple, optimistic, nostalgic, pure",
+    "explorer": "Adventure, freedom, discovery, independence",
+    "magician": "Transformation, vision, making dreams real",
+    "everyman": "Relatable, authentic, humble, inclusive",
+    "lover": "Intimacy, passion, sensory pleasure, connection",
+    "jester": "Playful, humorous, entertaining, irreverent",
+    "caregiver": "Compassionate, nurturing, protective, supportive",
+    "creator": "Innovation, imagination, self-expression",
+    "ruler": "Power, control, exclusivity, leadership"
+}
+
+# Positioning strategies
+POSITIONING_STRATEGIES = {
+    "market-leader": "Confident, authoritative, setting industry standards",
+    "challenger": "Disruptive, comparative, highlighting competitor weaknesses",
+    "niche-specialist": "Expert, focused, deep domain knowledge",
+    "value-innovator": "Game-changing benefits, unique value proposition",
+    "customer-champion": "Empathetic, user-focused, community-driven"
+}
+
+# Customer journey stages
+JOURNEY_STAGES = {
+    "awareness": "Top-of-funnel: Educational content, problem awareness",
+    "consideration": "Middle-of-funnel: Comparison, feature-benefit analysis", 
+    "conversion": "Bottom-of-funnel: Urgency, clear CTAs, purchase-focused",
+    "retention": "Post-purchase: Loyalty, community, ongoing value",
+    "advocacy": "Advocacy: Social proof, testimonials, referrals"
+}
+
+CONTENT_TYPES = ["social_media", "email_copy", "ad_copy"]
+
+# Creative brief sections as (field, heading), in brief order
+BRIEF_SECTIONS = [
+    ("target_audience_persona", "TARGET AUDIENCE PERSONA"),
+    ("brand_positioning_messaging", "BRAND POSITIONING & MESSAGING"),
+    ("creative_direction", "CREATIVE DIRECTION")
+]
+
+# Campaign inputs each section is written from. Sections never see each other, so they are
+# generated in parallel, and changing an input only regenerates the sections listed against it.
+SECTION_INPUTS = {
+    "target_audience_persona": ["campaign_goal", "journey_stage", "additional_context", "image"],
+    "brand_positioning_messaging": ["campaign_goal", "brand_archetype", "positioning", "additional_context"],
+    "creative_direction": ["campaign_goal", "brand_archetype", "journey_stage", "additional_context", "image"]
+}
+
+SECTION_GUIDANCE = {
+    "target_audience_persona": "demographics, psychographics, behaviours and the needs this campaign meets",
+    "brand_positioning_messaging": "positioning against competitors, key messaging pillars, brand voice and the unique selling proposition",
+    "creative_direction": "visual style, content themes, tone and the call-to-action strategy"
+}
+
+# Brief sections each content type is written from; only these are sent with its prompt
+CONTENT_FIELDS = {
+    "social_media": ["target_audience_persona", "creative_direction"],
+    "email_copy": ["target_audience_persona", "brand_positioning_messaging"],
+    "ad_copy": ["brand_positioning_messaging"]
+}
+
+
+def _describe_input(name, inputs):
+    """One CAMPAIGN CONTEXT line for a campaign input"""
+    value = inputs[name]
+    if name == "campaign_goal":
+        return f"- Primary Goal: {value}"
+    if name == "brand_archetype":
+        return f"- Brand Archetype: {value} - {BRAND_ARCHETYPES[value]}"
+    if name == "positioning":
+        return f"- Market Positioning: {value} - {POSITIONING_STRATEGIES[value]}"
+    if name == "journey_stage":
+        return f"- Target Journey Stage: {value} - {JOURNEY_STAGES[value]}"
+    if name == "additional_context":
+        return f"- Additional Context: {value}"
+    if name == "image":
+        return "- Product/Inspiration Image: attached" if value else ""
+    raise KeyError(name)
+
+
+def build_section_prompt(field, inputs):
+    """Build the prompt for one brief section from only the campaign inputs it depends on
+
+    inputs maps the names in SECTION_INPUTS to values; image is anything truthy when an image is attached.
+    """
+    heading = dict(BRIEF_SECTIONS)[field]
+    context_lines = "\n        ".join(
+        line for line in (_describe_input(name, inputs) for name in SECTION_INPUTS[field]) if line
+    )
+    return f"""
+        As a senior marketing strategist, write the {heading} section of a creative brief.
+
+        CAMPAIGN CONTEXT:
+        {context_lines}
+
+        Cover {SECTION_GUIDANCE[field]}.
+        Write only this section's content in markdown, without a section heading.
+        Keep it professional yet actionable.
+        """
+
+
+def build_adapt_prompt(field, inputs, seed):
+    """Build the prompt that adapts a section written for a similar campaign, instead of writing it from scratch"""
+    heading = dict(BRIEF_SECTIONS)[field]
+    context_lines = "\n        ".join(
+        line for line in (_describe_input(name, inputs) for name in SECTION_INPUTS[field]) if line
+    )
+    return f"""
+        As a senior marketing strategist, adapt the {heading} section below, written for a similar
+        campaign, to this campaign.
+
+        CAMPAIGN CONTEXT:
+        {context_lines}
+
+        EXISTING SECTION:
+        {seed}
+
+        Keep what still fits and change only what this campaign's goal and context require.
+        Write only the adapted section's content in markdown, without a section heading.
+        """
+
+
+def build_content_prompt(content_type):
+    """Build the instruction for one content type; the brief itself comes from the brief context"""
+    content_prompts = {
+        "social_media": "Based on the creative brief above, create 5 engaging social media posts.",
+        "email_copy": "Based on the creative brief above, write 2 email variations.",
+        "ad_copy": "Based on the creative brief above, create 3 ad variations for digital platforms."
+    }
+
+    return content_prompts.get(content_type, content_prompts["social_media"])
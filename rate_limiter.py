@@ -0,0 +1,144 @@
+"""Process-wide request and token rate limiting with adaptive concurrency for a shared API key
+
+Callers queue in FIFO order for a slot that satisfies the requests-per-minute bucket, the
+tokens-per-minute bucket and the current concurrency limit. Throttling responses (429/503)
+halve the concurrency limit and pause the whole queue briefly; successes grow it back one
+slot at a time (AIMD), so throughput settles just under the quota instead of collapsing
+into a retry storm.
+
+Background callers (speculative prefetch) queue behind every foreground caller and leave
+BACKGROUND_RESERVED_SLOTS of the concurrency limit free, so they only use spare capacity.
+"""
+import itertools
+import threading
+import time
+from collections import deque
+
+REQUESTS_PER_MINUTE = 60
+TOKENS_PER_MINUTE = 250_000
+MAX_CONCURRENCY = 8
+MIN_CONCURRENCY = 1
+THROTTLE_PAUSE_SECONDS = 2.0
+BACKGROUND_RESERVED_SLOTS = 1
+# How often a waiting caller re-reports its queue position
+WAIT_REPORT_INTERVAL = 1.0
+
+
+class TokenBucket:
+    """Refill capacity per minute continuously; a bucket may go negative to absorb underestimates"""
+
+    def __init__(self, per_minute):
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now):
+        self.available = min(self.capacity, self.available + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def seconds_until(self, amount):
+        # Never ask for more than a full bucket, or an oversized request would wait forever
+        shortfall = min(amount, self.capacity) - self.available
+        return max(0.0, shortfall / self.rate)
+
+
+class RateLimiter:
+    """FIFO admission control over request rate, token rate and in-flight concurrency"""
+
+    def __init__(self, requests_per_minute=REQUESTS_PER_MINUTE, tokens_per_minute=TOKENS_PER_MINUTE,
+                 max_concurrency=MAX_CONCURRENCY, min_concurrency=MIN_CONCURRENCY):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.throttled = 0
+
+        self._queue = deque()
+        self._background = {}
+        self._tickets = itertools.count()
+        self._paused_until = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, estimated_tokens, on_wait=None, background=None):
+        """Block until this caller may send a request; on_wait(position, seconds) reports queueing
+
+        background, when given, is a callable that returns True while the caller should yield to
+        foreground callers; it is re-checked while waiting, so a caller can be promoted.
+        Returns a ticket to pass to release.
+        """
+        with self._condition:
+            ticket = next(self._tickets)
+            self._queue.append(ticket)
+            if background is not None:
+                self._background[ticket] = background
+            last_report = None
+            try:
+                while True:
+                    now = time.monotonic()
+                    self.requests.refill(now)
+                    self.tokens.refill(now)
+
+                    wait = 0.0
+                    if self._next_ticket() == ticket:
+                        wait = max(
+                            self._paused_until - now,
+                            self.requests.seconds_until(1),
+                            self.tokens.seconds_until(estimated_tokens)
+                        )
+                        limit = int(self.concurrency_limit)
+                        if self._is_background(ticket):
+                            limit -= BACKGROUND_RESERVED_SLOTS
+                        if wait <= 0 and self.in_flight < limit:
+                            self.requests.available -= 1
+                            self.tokens.available -= estimated_tokens
+                            self.in_flight += 1
+                            return {"estimated_tokens": estimated_tokens}
+
+                    if on_wait is not None and (last_report is None or now - last_report >= WAIT_REPORT_INTERVAL):
+                        on_wait(self._queue.index(ticket) + 1, wait)
+                        last_report = now
+                    self._condition.wait(timeout=min(max(wait, 0.05), WAIT_REPORT_INTERVAL))
+            finally:
+                self._queue.remove(ticket)
+                self._background.pop(ticket, None)
+                self._condition.notify_all()
+
+    def release(self, ticket, actual_tokens=None, throttled=False):
+        """Return the caller's slot, correct the token estimate and adapt concurrency"""
+        with self._condition:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                self.tokens.available += ticket["estimated_tokens"] - actual_tokens
+
+            if throttled:
+                self.throttled += 1
+                self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+                self._paused_until = max(self._paused_until, time.monotonic() + THROTTLE_PAUSE_SECONDS)
+            else:
+                self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1 / self.concurrency_limit)
+
+            self._condition.notify_all()
+
+    def _is_background(self, ticket):
+        background = self._background.get(ticket)
+        return background is not None and background()
+
+    def _next_ticket(self):
+        """Oldest foreground ticket, or the oldest ticket when only background callers wait"""
+        for ticket in self._queue:
+            if not self._is_background(ticket):
+                return ticket
+        return self._queue[0]
+
+    def stats(self):
+        with self._condition:
+            return {
+                "queued": len(self._queue),
+                "background": sum(1 for ticket in self._queue if self._is_background(ticket)),
+                "in_flight": self.in_flight,
+                "concurrency_limit": int(self.concurrency_limit),
+                "throttled": self.throttled
+            }
@@ -0,0 +1,80 @@
+"""Per-session on-disk spill store for chat history that no longer fits in session state"""
+import os
+import sqlite3
+import threading
+import time
+
+SESSION_TTL_SECONDS = 24 * 3600
+EVICTION_INTERVAL_SECONDS = 300
+
+
+class SessionStore:
+    """Hold each session's oldest chat messages in SQLite, dropping sessions idle past the TTL"""
+
+    def __init__(self, path, ttl_seconds=SESSION_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._last_eviction = 0.0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "session_id TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL, content TEXT NOT NULL, "
+            "PRIMARY KEY (session_id, seq))"
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS sessions (session_id TEXT PRIMARY KEY, last_seen REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS sessions_last_seen ON sessions (last_seen)")
+        self._db.commit()
+
+    def append(self, session_id, first_seq, messages):
+        """Store messages for session_id, numbered from first_seq"""
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO messages (session_id, seq, role, content) VALUES (?, ?, ?, ?)",
+                [(session_id, first_seq + i, m["role"], m["content"]) for i, m in enumerate(messages)]
+            )
+            self._touch(session_id)
+            self._db.commit()
+        self._maybe_evict()
+
+    def load(self, session_id, start_seq, end_seq):
+        """Messages with start_seq <= seq < end_seq, oldest first"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, start_seq, end_seq)
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def touch(self, session_id):
+        """Mark session_id as active so its spilled history survives eviction"""
+        with self._lock:
+            self._touch(session_id)
+            self._db.commit()
+        self._maybe_evict()
+
+    def evict_idle(self):
+        """Delete spilled history of sessions idle longer than the TTL"""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            self._db.execute(
+                "DELETE FROM messages WHERE session_id IN (SELECT session_id FROM sessions WHERE last_seen < ?)",
+                (cutoff,)
+            )
+            self._db.execute("DELETE FROM sessions WHERE last_seen < ?", (cutoff,))
+            self._db.commit()
+            self._last_eviction = time.time()
+
+    def _touch(self, session_id):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, last_seen) VALUES (?, ?)", (session_id, time.time())
+        )
+
+    def _maybe_evict(self):
+        if time.time() - self._last_eviction > EVICTION_INTERVAL_SECONDS:
+            self.evict_idle()
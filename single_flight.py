@@ -0,0 +1,59 @@
+"""Process-wide single-flight: concurrent identical calls share one execution and its result"""
+import threading
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run fn at most once per key at a time; callers arriving while it runs wait for its outcome"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+        """Return (result, shared); shared is True when another caller's run produced the result
+
+        An error raised by fn reaches every caller attached to that run. If the running caller is
+        interrupted instead (a Streamlit rerun, KeyboardInterrupt), the waiters start over rather
+        than inherit another thread's control-flow exception.
+        """
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                return self._run(key, flight, fn), False
+
+            flight.done.wait()
+            if flight.error is None:
+                with self._lock:
+                    self.shared += 1
+                return flight.result, True
+            if isinstance(flight.error, Exception):
+                raise flight.error
+
+    def _run(self, key, flight, fn):
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {"in_flight": len(self._flights), "shared": self.shared}
@@ -0,0 +1,85 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from brief_schema import BRIEF_FIELDS, campaign_inputs
+from campaign_graph import adopt_brief, build_campaign_graph, open_checkpointer, run_brief
+from generation import create_runtime
+from prompts import BRIEF_SECTIONS
+
+
+def make_runtime(path):
+    return create_runtime(
+        cache_path=str(path / "responses.sqlite3"), metrics_path=str(path / "metrics.jsonl"), registry_path=None
+    )
+
+
+@pytest.fixture
+def runtime(tmp_path):
+    return make_runtime(tmp_path)
+
+
+@pytest.fixture
+def checkpointer(tmp_path):
+    return open_checkpointer(str(tmp_path / "graph.sqlite3"), ttl_seconds=60)
+
+
+class FakeModels:
+    """Answers each brief section prompt, failing the one whose heading is in fail"""
+
+    def __init__(self, fail=None):
+        self.fail = fail
+        self.calls = []
+
+    def generate_content(self, model, contents, config=None):
+        field = next(field for field, heading in BRIEF_SECTIONS if heading in contents)
+        self.calls.append(field)
+        if field == self.fail:
+            raise ValueError("model failed")
+        return SimpleNamespace(text=f"{field}: " + "detail " * 40, usage_metadata=None)
+
+
+def thread_rows(checkpointer, thread_id):
+    return [
+        checkpointer.conn.execute(f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+        for table in ("checkpoints", "writes", "threads")
+    ]
+
+
+def test_idle_threads_are_deleted_from_the_checkpointer(runtime, checkpointer):
+    graph = build_campaign_graph(runtime, checkpointer)
+    adopt_brief(graph, "idle", "Old brief")
+    adopt_brief(graph, "active", "New brief")
+    checkpointer.conn.execute("UPDATE threads SET last_seen = ? WHERE thread_id = 'idle'", (time.time() - 120,))
+    assert thread_rows(checkpointer, "idle")[0] > 0
+
+    checkpointer.evict_idle()
+
+    assert thread_rows(checkpointer, "idle") == [0, 0, 0]
+    assert graph.get_state({"configurable": {"thread_id": "idle"}}).values == {}
+    assert graph.get_state({"configurable": {"thread_id": "active"}}).values["brief"] == "New brief"
+
+
+def test_brief_resumes_with_only_the_failed_section(tmp_path, runtime, checkpointer):
+    graph = build_campaign_graph(runtime, checkpointer)
+    failed = BRIEF_FIELDS[1]
+    client = SimpleNamespace(models=FakeModels(fail=failed))
+    inputs = campaign_inputs("Launch a trail shoe", "hero", "challenger", "awareness")
+
+    with pytest.raises(ValueError):
+        run_brief(graph, "campaign", client, inputs)
+    assert sorted(client.models.calls) == sorted(BRIEF_FIELDS)
+
+    # A new response cache, so finished sections can only come from the checkpoint
+    (tmp_path / "restarted").mkdir()
+    graph = build_campaign_graph(make_runtime(tmp_path / "restarted"), checkpointer)
+    client.models = FakeModels()
+    state = run_brief(graph, "campaign", client, inputs)
+    assert client.models.calls == [failed]
+    assert set(state["sections"]) == set(BRIEF_FIELDS)
+    assert state["brief"]
+
+    client.models = FakeModels()
+    assert run_brief(graph, "campaign", client, inputs)["brief"] == state["brief"]
+    assert client.models.calls == []
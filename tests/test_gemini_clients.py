@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from fake_gemini import FakeGeminiConfig, start_server
+from gemini_clients import ClientPool
+
+MODEL = "gemini-2.5-flash"
+
+
+@pytest.fixture
+def base_url():
+    server, url = start_server(FakeGeminiConfig(latency_median=0.01, latency_sigma=0.0, response_tokens=5))
+    yield url
+    server.shutdown()
+
+
+def generate(client):
+    return client.models.generate_content(model=MODEL, contents="Hello").text
+
+
+def test_same_key_shares_one_client(base_url):
+    pool = ClientPool(base_url=base_url)
+    assert pool.get("k1") is pool.get("k1")
+    assert pool.get("k1") is not pool.get("k2")
+
+
+def test_least_recently_used_key_is_dropped(base_url):
+    pool = ClientPool(base_url=base_url, max_clients=2)
+    first = pool.get("k1")
+    pool.get("k2")
+    pool.get("k1")
+    pool.get("k3")
+
+    assert len(pool) == 2
+    # k1 was used more recently than k2, so it is still the same client
+    assert pool.get("k1") is first
+
+
+def test_evicted_client_still_works_for_its_holders(base_url):
+    pool = ClientPool(base_url=base_url, max_clients=1)
+    held = pool.get("k1")
+    pool.get("k2")
+
+    # A session that got the client before it was evicted keeps using it
+    assert generate(held)
+    assert pool.get("k1") is not held
@@ -0,0 +1,173 @@
+import threading
+import time
+
+import pytest
+
+from hedging import AttemptCancelled, Hedger
+
+
+def learned_hedger(delay=0.05, **kwargs):
+    """A hedger that has already seen enough latencies to hedge after about delay seconds"""
+    hedger = Hedger(min_samples=1, **kwargs)
+    hedger.observe("call", delay)
+    return hedger
+
+
+def test_no_hedging_while_still_learning():
+    hedger = Hedger(min_samples=3)
+    hedger.observe("call", 0.1)
+    hedger.observe("call", 0.1)
+    assert hedger.hedge_delay("call") is None
+    hedger.observe("call", 0.1)
+    assert hedger.hedge_delay("call") == 0.1
+
+
+def test_fast_hedge_wins_over_a_slow_first_attempt():
+    hedger = learned_hedger()
+    attempts = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        attempts.append(is_hedge)
+        if not is_hedge:
+            time.sleep(0.5)
+            return "first"
+        return "hedge"
+
+    start = time.monotonic()
+    assert hedger.call(attempt, "call") == "hedge"
+    assert time.monotonic() - start < 0.4
+    assert attempts == [False, True]
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["hedge_wins"] == 1
+
+
+def test_fast_first_attempt_is_not_hedged():
+    hedger = learned_hedger(delay=1.0)
+    attempts = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        attempts.append(is_hedge)
+        return "first"
+
+    assert hedger.call(attempt, "call") == "first"
+    assert attempts == [False]
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_losing_attempt_is_cancelled_at_its_next_chunk_and_never_shown():
+    hedger = learned_hedger()
+    shown = []
+    loser_cancelled = threading.Event()
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        if is_hedge:
+            on_chunk("hedge text")
+            return "hedge"
+        # Makes no progress before the hedge starts, then keeps streaming
+        time.sleep(0.2)
+        try:
+            for i in range(100):
+                on_chunk(f"first {i}")
+                time.sleep(0.01)
+        except AttemptCancelled:
+            loser_cancelled.set()
+            raise
+        return "first"
+
+    assert hedger.call(attempt, "call", on_chunk=shown.append) == "hedge"
+    assert loser_cancelled.wait(2)
+    assert shown == ["hedge text"]
+
+
+def test_hedging_stops_when_the_budget_runs_out():
+    hedger = learned_hedger(budget_ratio=0.0, budget_burst=1.0)
+    attempts = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        attempts.append(is_hedge)
+        if not is_hedge:
+            time.sleep(0.15)
+        return "hedge" if is_hedge else "first"
+
+    assert hedger.call(attempt, "call") == "hedge"
+    # The budget paid for one hedge; the second slow call has to wait for its first attempt
+    assert hedger.call(attempt, "call") == "first"
+    assert attempts == [False, True, False]
+    assert hedger.stats()["hedged"] == 1
+    assert hedger.stats()["over_budget"] == 1
+
+
+def test_budget_earns_a_fraction_of_a_hedge_per_call():
+    hedger = Hedger(budget_ratio=0.25, budget_burst=1.0)
+    hedger.budget = 0.0
+    for _ in range(4):
+        hedger.call(lambda is_hedge, on_chunk, on_admit: "ok", "call")
+    assert hedger.budget == pytest.approx(1.0)
+
+
+def test_deadline_raises_timeout_without_waiting_for_the_attempt():
+    hedger = Hedger()
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        time.sleep(1.0)
+        return "late"
+
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        hedger.call(attempt, "call", deadline_seconds=0.2)
+    assert time.monotonic() - start < 0.6
+    assert hedger.stats()["deadlines_missed"] == 1
+
+
+def test_failed_first_attempt_raises_without_hedging():
+    hedger = learned_hedger(delay=1.0)
+    attempts = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        on_admit()
+        attempts.append(is_hedge)
+        raise ValueError("model failed")
+
+    with pytest.raises(ValueError):
+        hedger.call(attempt, "call")
+    assert attempts == [False]
+
+
+def test_attempt_queued_for_capacity_is_not_hedged_before_admission():
+    hedger = learned_hedger()
+    attempts = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        attempts.append(is_hedge)
+        # Waits for the rate limiter well past the hedge delay, then answers quickly
+        time.sleep(0.3)
+        on_admit()
+        time.sleep(0.01)
+        return "first"
+
+    assert hedger.call(attempt, "call") == "first"
+    assert attempts == [False]
+    assert hedger.stats()["hedged"] == 0
+
+
+def test_observed_latency_excludes_time_queued_for_capacity():
+    hedger = Hedger(min_samples=1)
+    shown = []
+
+    def attempt(is_hedge, on_chunk, on_admit):
+        time.sleep(0.3)
+        on_admit()
+        time.sleep(0.05)
+        if on_chunk is not None:
+            on_chunk("text")
+        return "done"
+
+    hedger.call(attempt, "call")
+    hedger.call(attempt, "streamed", on_chunk=shown.append)
+    assert 0.04 <= hedger.hedge_delay("call") < 0.25
+    assert 0.04 <= hedger.hedge_delay("streamed") < 0.25
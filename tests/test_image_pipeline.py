@@ -0,0 +1,40 @@
+import io
+
+import pytest
+from PIL import Image
+
+from image_pipeline import prepare_image
+
+
+def encode(image, image_format="PNG"):
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def decoded(payload):
+    return Image.open(io.BytesIO(payload["model_bytes"])).convert("RGB")
+
+
+@pytest.mark.parametrize("mode", ["RGBA", "LA"])
+def test_transparent_pixels_become_white(mode):
+    image = Image.new(mode, (50, 50), (0,) * len(mode))
+    pixel = decoded(prepare_image(encode(image))).getpixel((0, 0))
+    assert all(channel > 245 for channel in pixel)
+
+
+def test_palette_transparency_becomes_white():
+    image = Image.new("P", (50, 50), 0)
+    image.putpalette([0, 0, 0] * 256)
+    image.info["transparency"] = 0
+    pixel = decoded(prepare_image(encode(image))).getpixel((0, 0))
+    assert all(channel > 245 for channel in pixel)
+
+
+def test_opaque_pixels_keep_their_colour():
+    image = Image.new("RGBA", (50, 50), (200, 30, 30, 0))
+    image.paste((200, 30, 30, 255), (0, 0, 25, 50))
+    result = decoded(prepare_image(encode(image)))
+    red, green, blue = result.getpixel((5, 25))
+    assert red > 180 and green < 60 and blue < 60
+    assert all(channel > 245 for channel in result.getpixel((45, 25)))
@@ -0,0 +1,163 @@
+import threading
+import time
+
+from jobs import CANCELLED, DONE, FAILED, RUNNING, JobManager
+
+
+def wait_finished(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not manager.get(job_id).finished:
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.01)
+    return manager.get(job_id)
+
+
+def test_job_result_and_callbacks():
+    manager = JobManager(max_workers=2)
+    received = {}
+
+    def fn(value, on_chunk=None, on_wait=None):
+        received.update(on_chunk=on_chunk, on_wait=on_wait)
+        return value * 2
+
+    job = wait_finished(manager, manager.submit("label", fn, 21))
+    assert job.status == DONE
+    assert job.result == 42
+    # Without stream there is no progress callback, so calls use the single-response API
+    assert received["on_chunk"] is None
+    assert received["on_wait"] is not None
+
+
+def test_streamed_progress_is_recorded():
+    manager = JobManager(max_workers=1)
+
+    def fn(on_chunk=None, on_wait=None):
+        on_chunk("partial")
+        return "full"
+
+    job = wait_finished(manager, manager.submit("label", fn, stream=True))
+    assert job.partial == "partial"
+    assert job.result == "full"
+
+
+def test_failure_is_recorded_as_the_error_message():
+    manager = JobManager(max_workers=1)
+
+    def fn(on_chunk=None, on_wait=None):
+        raise ValueError("model failed")
+
+    job = wait_finished(manager, manager.submit("label", fn))
+    assert job.status == FAILED
+    assert job.error == "model failed"
+
+
+def test_running_job_stops_at_its_next_progress_report():
+    manager = JobManager(max_workers=1)
+    started = threading.Event()
+    reports = []
+
+    def fn(on_chunk=None, on_wait=None):
+        started.set()
+        for i in range(500):
+            on_chunk(str(i))
+            reports.append(i)
+            time.sleep(0.01)
+        return "never"
+
+    job_id = manager.submit("label", fn, stream=True)
+    started.wait(5)
+    assert manager.get(job_id).status == RUNNING
+    manager.cancel(job_id)
+    job = wait_finished(manager, job_id)
+
+    assert job.status == CANCELLED
+    assert job.result is None
+    assert len(reports) < 500
+
+
+def test_cancelled_job_stops_while_queued_for_the_rate_limiter():
+    manager = JobManager(max_workers=1)
+    started = threading.Event()
+
+    def fn(on_chunk=None, on_wait=None):
+        started.set()
+        while True:
+            on_wait(1, 0.0)
+            time.sleep(0.01)
+
+    job_id = manager.submit("label", fn)
+    started.wait(5)
+    manager.cancel(job_id)
+    assert wait_finished(manager, job_id).status == CANCELLED
+
+
+def test_job_cancelled_before_it_starts_never_runs():
+    manager = JobManager(max_workers=1)
+    release = threading.Event()
+    calls = []
+
+    def blocker(on_chunk=None, on_wait=None):
+        release.wait(5)
+
+    def fn(on_chunk=None, on_wait=None):
+        calls.append(1)
+
+    blocking_id = manager.submit("blocker", blocker)
+    queued_id = manager.submit("queued", fn)
+    manager.cancel(queued_id)
+    release.set()
+
+    assert wait_finished(manager, queued_id).status == CANCELLED
+    assert wait_finished(manager, blocking_id).status == DONE
+    assert calls == []
+
+
+def test_finished_jobs_expire_after_the_ttl_but_running_ones_do_not():
+    manager = JobManager(max_workers=2, ttl_seconds=0.1)
+    release = threading.Event()
+
+    def quick(on_chunk=None, on_wait=None):
+        return "done"
+
+    def slow(on_chunk=None, on_wait=None):
+        release.wait(5)
+
+    finished_id = manager.submit("quick", quick)
+    wait_finished(manager, finished_id)
+    running_id = manager.submit("slow", slow)
+    time.sleep(0.2)
+
+    # Expired jobs are evicted on the next submit
+    manager.submit("quick", quick)
+    assert manager.get(finished_id) is None
+    assert manager.get(running_id) is not None
+    release.set()
+
+
+def test_background_job_is_low_priority_until_promoted():
+    manager = JobManager(max_workers=1, background_workers=1)
+    release = threading.Event()
+    priority = []
+
+    def fn(on_chunk=None, on_wait=None, background=None):
+        priority.append(background())
+        release.wait(5)
+        priority.append(background())
+
+    job_id = manager.submit("prefetch", fn, background=True)
+    while not priority:
+        time.sleep(0.01)
+    manager.promote(job_id)
+    release.set()
+    wait_finished(manager, job_id)
+
+    assert priority == [True, False]
+
+
+def test_discard_forgets_a_job():
+    manager = JobManager(max_workers=1)
+    job_id = manager.submit("label", lambda on_chunk=None, on_wait=None: None)
+    wait_finished(manager, job_id)
+    manager.discard(job_id)
+    assert manager.get(job_id) is None
+    assert manager.stats()["completed"] == 1
@@ -0,0 +1,165 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.genai import errors
+
+import generation
+import rate_limiter
+from call_metrics import CallMetrics
+from rate_limiter import RateLimiter
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for condition"
+        time.sleep(0.01)
+
+
+def start_caller(limiter, name, admitted, background=None):
+    """Acquire on a thread, recording name once admitted; returns the thread and its ticket holder"""
+    ticket = []
+
+    def run():
+        ticket.append(limiter.acquire(10, background=background))
+        admitted.append(name)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, ticket
+
+
+def test_waiting_callers_are_admitted_in_arrival_order():
+    limiter = RateLimiter(max_concurrency=1)
+    held = limiter.acquire(10)
+    admitted = []
+    callers = []
+    for name in "abcd":
+        callers.append(start_caller(limiter, name, admitted))
+        # Queue each caller before the next one arrives
+        wait_until(lambda: limiter.stats()["queued"] == len(callers))
+
+    limiter.release(held)
+    for thread, ticket in callers:
+        wait_until(lambda: ticket)
+        limiter.release(ticket[0])
+        thread.join(timeout=5)
+
+    assert admitted == list("abcd")
+
+
+def test_background_caller_yields_to_later_foreground_caller():
+    limiter = RateLimiter(max_concurrency=3)
+    held = [limiter.acquire(10), limiter.acquire(10)]
+    admitted = []
+    background_thread, background_ticket = start_caller(limiter, "background", admitted, background=lambda: True)
+    wait_until(lambda: limiter.stats()["background"] == 1)
+
+    # One slot is free, but it is reserved for foreground callers
+    foreground_thread, foreground_ticket = start_caller(limiter, "foreground", admitted)
+    foreground_thread.join(timeout=5)
+    assert admitted == ["foreground"]
+
+    limiter.release(held.pop())
+    time.sleep(0.2)
+    assert admitted == ["foreground"]
+
+    limiter.release(held.pop())
+    background_thread.join(timeout=5)
+    assert admitted == ["foreground", "background"]
+    limiter.release(background_ticket[0])
+    limiter.release(foreground_ticket[0])
+
+
+def test_promoted_background_caller_is_admitted_in_order():
+    limiter = RateLimiter(max_concurrency=1)
+    held = limiter.acquire(10)
+    admitted = []
+    promoted = threading.Event()
+    background_thread, _ = start_caller(limiter, "background", admitted, background=lambda: not promoted.is_set())
+    wait_until(lambda: limiter.stats()["queued"] == 1)
+    foreground_thread, _ = start_caller(limiter, "foreground", admitted)
+    wait_until(lambda: limiter.stats()["queued"] == 2)
+
+    promoted.set()
+    limiter.release(held)
+    background_thread.join(timeout=5)
+    assert admitted == ["background"]
+
+
+def test_throttling_halves_the_limit_down_to_the_minimum_and_success_grows_it_back(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "THROTTLE_PAUSE_SECONDS", 0.0)
+    limiter = RateLimiter(max_concurrency=8, min_concurrency=1)
+
+    limits = []
+    for _ in range(5):
+        limiter.release(limiter.acquire(10), throttled=True)
+        limits.append(limiter.concurrency_limit)
+    assert limits == [4, 2, 1, 1, 1]
+    assert limiter.stats()["throttled"] == 5
+
+    limiter.release(limiter.acquire(10))
+    assert limiter.concurrency_limit == 2
+    limiter.release(limiter.acquire(10))
+    assert limiter.concurrency_limit == 2.5
+
+
+def test_throttling_pauses_the_queue(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "THROTTLE_PAUSE_SECONDS", 0.3)
+    limiter = RateLimiter()
+    limiter.release(limiter.acquire(10), throttled=True)
+
+    start = time.monotonic()
+    limiter.release(limiter.acquire(10))
+    assert time.monotonic() - start >= 0.25
+
+
+class FailingModels:
+    """generate_content that fails with the given errors, then succeeds"""
+
+    def __init__(self, failures):
+        self.failures = list(failures)
+        self.calls = 0
+
+    def generate_content(self, model, contents, config=None):
+        self.calls += 1
+        if self.failures:
+            raise self.failures.pop(0)
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+
+@pytest.mark.parametrize("error", [
+    errors.ClientError(429, {"error": {"code": 429, "message": "quota", "status": "RESOURCE_EXHAUSTED"}}),
+    errors.ServerError(503, {"error": {"code": 503, "message": "busy", "status": "UNAVAILABLE"}})
+])
+def test_call_model_retries_throttling_errors_and_halves_the_limit(monkeypatch, tmp_path, error):
+    monkeypatch.setattr(rate_limiter, "THROTTLE_PAUSE_SECONDS", 0.0)
+    monkeypatch.setattr(generation, "RETRY_BASE_DELAY", 0.0)
+    limiter = RateLimiter(max_concurrency=8)
+    runtime = SimpleNamespace(limiter=limiter, metrics=CallMetrics(str(tmp_path / "calls.jsonl")))
+    client = SimpleNamespace(models=FailingModels([error]))
+
+    text, _ = generation.call_model(client, runtime, "model", "prompt", "test")
+
+    assert text == "ok"
+    assert client.models.calls == 2
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.in_flight == 0
+    # Halved to 4 by the throttle, then one additive step for the success
+    assert limiter.concurrency_limit == 4.25
+
+
+def test_call_model_does_not_retry_or_throttle_on_other_errors(monkeypatch, tmp_path):
+    limiter = RateLimiter(max_concurrency=8)
+    runtime = SimpleNamespace(limiter=limiter, metrics=CallMetrics(str(tmp_path / "calls.jsonl")))
+    error = errors.ServerError(500, {"error": {"code": 500, "message": "boom", "status": "INTERNAL"}})
+    client = SimpleNamespace(models=FailingModels([error]))
+
+    with pytest.raises(errors.ServerError):
+        generation.call_model(client, runtime, "model", "prompt", "test")
+
+    assert client.models.calls == 1
+    assert limiter.stats()["throttled"] == 0
+    assert limiter.in_flight == 0
@@ -0,0 +1,130 @@
+import threading
+import time
+
+import pytest
+
+from single_flight import SingleFlight
+
+
+class Interrupted(BaseException):
+    """Stands in for a Streamlit rerun or a cancelled job unwinding the leader's thread"""
+
+
+def start_waiters(flight, key, fn, count):
+    """Call flight.do on count threads; returns the threads and a list that collects their outcomes"""
+    outcomes = []
+
+    def run():
+        try:
+            outcomes.append(("result", flight.do(key, fn)))
+        except Exception as e:
+            outcomes.append(("error", e))
+
+    threads = [threading.Thread(target=run, daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    # Give them time to attach to the running flight
+    time.sleep(0.2)
+    return threads, outcomes
+
+
+def run_leader(flight, key, fn):
+    """Start a leader on a thread and wait until fn is running; returns the thread and its outcome list"""
+    outcome = []
+
+    def run():
+        try:
+            outcome.append(flight.do(key, fn))
+        except BaseException as e:
+            outcome.append(e)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread, outcome
+
+
+def test_concurrent_callers_share_one_run():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    leader, leader_outcome = run_leader(flight, "k", fn)
+    while not calls:
+        time.sleep(0.01)
+    waiters, outcomes = start_waiters(flight, "k", fn, 3)
+    release.set()
+    for thread in waiters + [leader]:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert leader_outcome == [("value", False)]
+    assert outcomes == [("result", ("value", True))] * 3
+    assert flight.stats() == {"in_flight": 0, "shared": 3}
+
+
+def test_error_reaches_every_waiter():
+    flight = SingleFlight()
+    release = threading.Event()
+    error = ValueError("model failed")
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(5)
+        raise error
+
+    leader, leader_outcome = run_leader(flight, "k", fn)
+    while not calls:
+        time.sleep(0.01)
+    waiters, outcomes = start_waiters(flight, "k", fn, 3)
+    release.set()
+    for thread in waiters + [leader]:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert leader_outcome == [error]
+    assert outcomes == [("error", error)] * 3
+    # A failed run is not remembered; the next caller runs fn again
+    with pytest.raises(ValueError):
+        flight.do("k", fn)
+    assert len(calls) == 2
+
+
+def test_waiters_rerun_when_the_leader_is_interrupted():
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(5)
+            raise Interrupted()
+        # Long enough for the other waiters to attach to this run
+        time.sleep(0.2)
+        return "value"
+
+    leader, leader_outcome = run_leader(flight, "k", fn)
+    while not calls:
+        time.sleep(0.01)
+    waiters, outcomes = start_waiters(flight, "k", fn, 3)
+    release.set()
+    for thread in waiters + [leader]:
+        thread.join(timeout=5)
+
+    assert isinstance(leader_outcome[0], Interrupted)
+    # One waiter took over as leader and the rest shared its run
+    assert len(calls) == 2
+    assert sorted(outcomes) == [("result", ("value", False))] + [("result", ("value", True))] * 2
+
+
+def test_different_keys_run_independently():
+    flight = SingleFlight()
+    assert flight.do("a", lambda: 1) == (1, False)
+    assert flight.do("b", lambda: 2) == (2, False)
+    assert flight.stats()["shared"] == 0